@@ -18,6 +18,14 @@ dashboard.dashboard_title = "New title"
 # Save all changes
 dashboard.save()
 
+# Change the colors of all dashboards, saving them concurrently
+for dashboard in dashboards:
+    dashboard.update_colors({"label": "#fcba03"})
+result = client.dashboards.save_many(dashboards, max_workers=8)
+print(f"Saved {len(result.results) - len(result.errors)} dashboards in {result.elapsed:.1f}s")
+for index, error in result.errors.items():
+    print(dashboards[index], error)
+
 # Fetch again
 dashboards = client.dashboards.find()
 print(dashboards)
@@ -1,9 +1,10 @@
 """Assets."""
 import json
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Callable, Optional, Union
 
-from supersetapiclient.base import raise_for_status
+from supersetapiclient.base import ObjectFactories, raise_for_status
+from supersetapiclient.multipart import MultipartEncoder, Upload, open_upload
 
 
 class Assets:
@@ -25,40 +26,56 @@ class Assets:
     def export_url(self):
         return self.client.join_urls(self.base_url, "export/")
 
-    def export(self, path: Union[Path, str]) -> None:
-        """Export object into an importable file"""
-        response = self.client.get(self.export_url)
-        raise_for_status(response)
+    def export(
+        self,
+        path: Union[Path, str, BinaryIO],
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> None:
+        """Export all assets into an importable ZIP file.
 
-        content_type = response.headers["content-type"].strip()
-        if content_type.startswith("application/zip"):
-            data = response.content
-            with open(path, "wb") as f:
-                f.write(data)
-            return
-        raise ValueError(f"Unknown content type {content_type}")
+        The export is streamed to path, see ObjectFactories.export.
+        """
+        with self.client.get(self.export_url, stream=True) as response:
+            raise_for_status(response)
+            ObjectFactories._write_export(response, path, progress=progress)
 
-    def import_file(self, file_path, passwords=None) -> bool:
+    def import_file(
+        self,
+        file_path: Upload,
+        passwords=None,
+        file_name: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
         """Import a file on remote.
 
-        :param file_path: Path to a JSON or ZIP file containing the import data
+        The file is streamed from disk rather than loaded in memory.
+
+        :param file_path: Path to a JSON or ZIP file containing the import data,
+        or its content as bytes or a binary file object
         :param passwords: JSON map of passwords for each featured database in
         the file. If the ZIP includes a database config in the path
         databases/MyDatabase.yaml, the password should be provided in the
         following format: {"MyDatabase": "my_password"}
+        :param file_name: Name of the uploaded file, defaults to the name of
+        file_path
+        :param progress: Called with the number of bytes sent and the total
         """
-        file_path = Path(file_path)
-        if not file_path.exists():
+        if isinstance(file_path, (str, Path)) and not Path(file_path).exists():
             return False
-        file_ext = file_path.suffix.replace(".", "")
-        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
-
-        files = {
-            "bundle": (file_path.name, open(file_path.name, "rb"), f"application/{file_ext}"),
-            "passwords": json.dumps(passwords),
-        }
-        response = self.client.post(self.import_url, files=files)
+        with open_upload(file_path, file_name) as (file_name, f):
+            body = self._import_body(f, file_name, passwords, progress)
+            response = self.client.post(self.import_url, data=body, headers={"Content-Type": body.content_type})
         raise_for_status(response)
 
         # If import is successful, the following is returned: {'message': 'OK'}
         return response.json().get("message") == "OK"
+
+    @staticmethod
+    def _import_body(f, file_name: str, passwords=None, progress=None) -> MultipartEncoder:
+        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
+        file_ext = Path(file_name).suffix.replace(".", "")
+        fields = [
+            ("bundle", (file_name, f, f"application/{file_ext}")),
+            ("passwords", json.dumps(passwords)),
+        ]
+        return MultipartEncoder(fields, progress=progress)
@@ -0,0 +1,818 @@
+"""An asyncio Superset REST Api Client."""
+import asyncio
+import collections
+import itertools
+import json
+import logging
+import math
+import time
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    from functools import cached_property
+except ImportError:  # pragma: no cover
+    # Python<3.8
+    from cached_property import cached_property
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from requests import HTTPError
+
+from supersetapiclient import columnar
+from supersetapiclient.assets import Assets
+from supersetapiclient.base import (
+    CHUNK_SIZE,
+    BatchResult,
+    Object,
+    ObjectFactories,
+    content_length,
+    open_target,
+    raise_http_error,
+)
+from supersetapiclient.charts import Chart, Charts
+from supersetapiclient.client import SAFE_METHODS, SQL_CHUNK_SIZE, SupersetClient, jwt_expiry
+from supersetapiclient.dashboards import Dashboards
+from supersetapiclient.databases import Databases
+from supersetapiclient.datasets import Datasets
+from supersetapiclient.exceptions import MultipleFound, NotFound
+from supersetapiclient.jsonstream import aiterparse
+from supersetapiclient.multipart import MultipartEncoder, Upload, open_upload
+from supersetapiclient.saved_queries import SavedQueries
+from supersetapiclient.sqllab import FINISHED_STATES, NO_CACHE, Query
+
+logger = logging.getLogger(__name__)
+
+
+def raise_for_status(response):
+    """Raise an HTTPError for an unsuccessful httpx response."""
+    if response.status_code < 400:
+        return
+    e = HTTPError(f"{response.status_code} Error: {response.reason_phrase} for url: {response.url}", response=response)
+    raise_http_error(e, response)
+
+
+async def aprefetch(func: Callable[..., Awaitable], items: Iterable, max_workers: int = 1) -> AsyncIterator:
+    """Map the coroutine function func over items, up to max_workers calls ahead.
+
+    Results are yielded in the order of items. Closing the iterator early
+    cancels pending calls.
+    """
+    items = iter(items)
+    pending = collections.deque()
+    try:
+        for item in itertools.islice(items, max(max_workers, 1)):
+            pending.append(asyncio.ensure_future(func(item)))
+        while pending:
+            result = await pending.popleft()
+            for item in itertools.islice(items, 1):
+                pending.append(asyncio.ensure_future(func(item)))
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def awrite_chunks(
+    chunks: AsyncIterable[bytes],
+    target: Union[Path, str, BinaryIO],
+    total: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> int:
+    """Write chunks to target, a path or a binary file object. See write_chunks."""
+    written = 0
+    with open_target(target) as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+            if progress is not None:
+                progress(written, total)
+    return written
+
+
+async def write_export(response, path: Union[Path, str, BinaryIO], progress: Optional[Callable] = None) -> None:
+    """Stream an export response to path."""
+    try:
+        if response.status_code >= 400:
+            # Read the error message
+            await response.aread()
+        raise_for_status(response)
+        if response.headers["content-type"].strip().startswith("application/zip"):
+            chunks = response.aiter_bytes(chunk_size=CHUNK_SIZE)
+            await awrite_chunks(chunks, path, total=content_length(response), progress=progress)
+            return
+        await response.aread()
+        ObjectFactories._write_legacy_export(response, path)
+    finally:
+        await response.aclose()
+
+
+async def abatched(items: AsyncIterable, size: int) -> AsyncIterator[list]:
+    """Group items in lists of up to size items."""
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def arun_batch(func: Callable[..., Awaitable], items: Iterable, max_workers: int = 1) -> BatchResult:
+    """Await func on each item with up to max_workers concurrent calls.
+
+    Failures are collected in the result instead of aborting the batch.
+    """
+
+    async def call(item):
+        try:
+            return await func(item), None
+        except Exception as e:
+            return None, e
+
+    start = time.perf_counter()
+    result = BatchResult()
+    i = 0
+    async for value, error in aprefetch(call, items, max_workers=max_workers):
+        result.results.append(value)
+        if error is not None:
+            logger.warning("Item %d of batch failed: %s", i, error)
+            result.errors[i] = error
+        i += 1
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+class AsyncObjectFactories(ObjectFactories):
+    """Awaitable counterpart of ObjectFactories.
+
+    Objects built by these factories are the same dataclasses as with
+    SupersetClient, but their fetch(), save(), delete() and export() methods
+    return awaitables.
+    """
+
+    async def _get_infos(self) -> dict:
+        if "_infos" not in self.__dict__:
+            infos = self._cached_infos()
+            if infos is None:
+                response = await self.client.get(self.info_url, params={"q": json.dumps(self._INFO_QUERY)})
+                raise_for_status(response)
+                infos = self._store_infos(response.json())
+            # Fill the cache of the synchronous property
+            self.__dict__["_infos"] = infos
+        return self._infos
+
+    async def get(self, id: int, columns: Optional[List[str]] = None):
+        """Get an object by id."""
+        url = self.client.join_urls(self.base_url, id)
+        response = await self.client.get(url, params=self._get_params(columns))
+        raise_for_status(response)
+
+        object_json = response.json().get("result")
+        object_json["id"] = id
+        return self._object_from_json(object_json)
+
+    async def _find_page(self, filters: list, page_size: int, page: int, columns: Optional[List[str]] = None):
+        params = self._find_params(filters, page_size=page_size, page=page, columns=columns)
+        response = await self.client.get(self.base_url, params=params)
+        raise_for_status(response)
+        response = response.json()
+
+        objects = [self._object_from_json(r) for r in response.get("result")]
+        return response.get("count", 0), objects
+
+    async def find(self, page_size: int = 100, page: int = 0, columns: Optional[List[str]] = None, **kwargs):
+        """Find and get objects from api."""
+        _, objects = await self._find_page(self._eq_filters(kwargs), page_size=page_size, page=page, columns=columns)
+        return objects
+
+    def iter_find(
+        self,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+        **kwargs,
+    ) -> AsyncIterator[Object]:
+        """Lazily iterate over all objects matching the filters, with ``async for``."""
+        return self._iter_filtered(self._eq_filters(kwargs), page_size=page_size, max_workers=max_workers, columns=columns)
+
+    async def _iter_filtered(
+        self,
+        filters: list,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+    ) -> AsyncIterator[Object]:
+        count, objects = await self._find_page(filters, page_size=page_size, page=0, columns=columns)
+        for o in objects:
+            yield o
+        page_size = self._served_page_size(count, objects, page_size)
+
+        async def get_page(page):
+            return (await self._find_page(filters, page_size=page_size, page=page, columns=columns))[1]
+
+        pages = math.ceil(count / page_size)
+        page_objects = aprefetch(get_page, range(1, pages), max_workers=max_workers)
+        try:
+            async for objects in page_objects:
+                if not objects:
+                    # Objects were deleted while iterating
+                    return
+                for o in objects:
+                    yield o
+        finally:
+            # Cancel the pages fetched ahead when iteration stops early
+            await page_objects.aclose()
+
+    async def find_all(
+        self,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+        **kwargs,
+    ) -> List[Object]:
+        """Find all objects matching the filters, across every page."""
+        return [o async for o in self.iter_find(page_size=page_size, max_workers=max_workers, columns=columns, **kwargs)]
+
+    async def get_many(
+        self,
+        ids: Iterable[int],
+        chunk_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[int, Object]:
+        """Get many objects by id, using as few requests as possible."""
+        ids = list(dict.fromkeys(ids))
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+        async def get_chunk(chunk):
+            filters = [{"col": "id", "opr": "in", "value": chunk}]
+            return [o async for o in self._iter_filtered(filters, page_size=len(chunk), columns=columns)]
+
+        found = {}
+        async for objects in aprefetch(get_chunk, chunks, max_workers=max_workers):
+            found.update((o.id, o) for o in objects)
+        return {i: found[i] for i in ids if i in found}
+
+    async def count(self):
+        """Count objects."""
+        response = await self.client.get(self.base_url)
+        raise_for_status(response)
+        return response.json()["count"]
+
+    async def find_one(self, **kwargs):
+        """Find only object or raise an Exception."""
+        objects = await self.find(**kwargs)
+        if len(objects) == 0:
+            raise NotFound(f"No {self.base_object.__name__} found")
+        if len(objects) > 1:
+            raise MultipleFound(f"Multiple {self.base_object.__name__} found")
+        return objects[0]
+
+    async def fetch(self, obj) -> None:
+        """Fetch additional object information."""
+        response = await self.client.get(obj.base_url)
+        raise_for_status(response)
+        obj.update_from_json(response.json().get("result"))
+
+    async def save(self, obj) -> None:
+        """Save object information."""
+        await self._get_infos()
+        o = self._save_payload(obj)
+        if not o:
+            return
+        response = await self.client.put(obj.base_url, json=o)
+        raise_for_status(response)
+        obj._mark_clean(o)
+
+    async def save_many(self, objects: Iterable[Object], max_workers: int = 4) -> BatchResult:
+        """Save objects, with up to max_workers concurrent requests."""
+        await self._get_infos()
+
+        async def save(obj):
+            await self.save(obj)
+            return obj
+
+        return await arun_batch(save, objects, max_workers=max_workers)
+
+    async def add(self, obj) -> int:
+        """Create an object on remote."""
+        await self._get_infos()
+        o = obj.to_json(columns=self.add_columns)
+        response = await self.client.post(self.base_url, json=o)
+        raise_for_status(response)
+        obj.id = response.json().get("id")
+        obj._parent = self
+        obj._mark_clean()
+        self._register(obj)
+        return obj.id
+
+    async def add_many(self, objects: Iterable[Object], max_workers: int = 4) -> BatchResult:
+        """Create objects on remote, with up to max_workers concurrent requests."""
+        await self._get_infos()
+
+        async def add(obj):
+            await self.add(obj)
+            return obj
+
+        return await arun_batch(add, objects, max_workers=max_workers)
+
+    async def export(
+        self,
+        ids: List[int],
+        path: Union[Path, str, BinaryIO],
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> None:
+        """Export object into an importable file. See ObjectFactories.export."""
+        response = await self.client.get(self.export_url, params=self._ids_params(ids), stream=True)
+        await write_export(response, path, progress=progress)
+
+    async def delete(self, id: int) -> bool:
+        """Delete a object on remote."""
+        url = self.client.join_urls(self.base_url, id)
+        response = await self.client.delete(url)
+        raise_for_status(response)
+        self._forget(id)
+        return response.json().get("message") == "OK"
+
+    async def delete_many(self, ids: Iterable[int], chunk_size: int = 100, max_workers: int = 1) -> BatchResult:
+        """Delete objects by id, with bulk requests of up to chunk_size ids.
+
+        See ObjectFactories.delete_many.
+        """
+        ids = list(ids)
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+        start = time.perf_counter()
+        result = BatchResult()
+        async for chunk_result in aprefetch(self._delete_chunk, chunks, max_workers=max_workers):
+            offset = len(result.results)
+            result.results.extend(chunk_result.results)
+            result.errors.update((offset + i, e) for i, e in chunk_result.errors.items())
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    async def _delete_chunk(self, ids: List[int]) -> BatchResult:
+        if not self.bulk_delete or len(ids) == 1:
+            return await arun_batch(self.delete, ids)
+        try:
+            response = await self.client.delete(self.base_url, params=self._ids_params(ids))
+            raise_for_status(response)
+        except (HTTPError, httpx.HTTPError) as e:
+            # Connection errors and timeouts fail the chunk, not the whole batch
+            if not isinstance(e, HTTPError) or e.response is None or not 400 <= e.response.status_code < 500:
+                logger.warning("Bulk delete of %d objects failed: %s", len(ids), e)
+                return BatchResult(results=[None] * len(ids), errors=dict.fromkeys(range(len(ids)), e))
+            if e.response.status_code == 405:
+                self.bulk_delete = False
+            logger.info("Bulk delete rejected, deleting %d objects one by one: %s", len(ids), e)
+            return await arun_batch(self.delete, ids)
+        for id in ids:
+            self._forget(id)
+        return BatchResult(results=[True] * len(ids))
+
+    async def import_file(
+        self,
+        file_path: Upload,
+        overwrite=False,
+        passwords=None,
+        file_name: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
+        """Import a file on remote. See ObjectFactories.import_file."""
+        with open_upload(file_path, file_name) as (file_name, f):
+            body = self._import_body(f, file_name, overwrite, passwords, progress)
+            response = await self.client.post(self.import_url, content=body, headers=self._upload_headers(body))
+        raise_for_status(response)
+
+        # If import is successful, the following is returned: {'message': 'OK'}
+        return response.json().get("message") == "OK"
+
+    @staticmethod
+    def _upload_headers(body: MultipartEncoder) -> dict:
+        return {"Accept": "application/json", "Content-Type": body.content_type, "Content-Length": str(len(body))}
+
+
+class AsyncDashboards(AsyncObjectFactories, Dashboards):
+    async def chart_ids(self, id: int) -> List[int]:
+        """Get the ids of the charts in a dashboard."""
+        response = await self.client.get(self.charts_url(id))
+        raise_for_status(response)
+        return [c["id"] for c in response.json().get("result", [])]
+
+    async def get_charts(self, id: int, max_workers: int = 1) -> List[Chart]:
+        """Get the charts of a dashboard."""
+        charts = await self.client.charts.get_many(await self.chart_ids(id), max_workers=max_workers)
+        return list(charts.values())
+
+
+class AsyncCharts(AsyncObjectFactories, Charts):
+    pass
+
+
+class AsyncDatasets(AsyncObjectFactories, Datasets):
+    pass
+
+
+class AsyncDatabases(AsyncObjectFactories, Databases):
+    async def test_connection(self, obj):
+        """Test connection to a database"""
+        connection_columns = ["database_name", "sqlalchemy_uri"]
+        o = {c: getattr(obj, c) for c in connection_columns}
+        response = await self.client.post(self.test_connection_url, json=o)
+        return response.json().get("message") == "OK"
+
+
+class AsyncSavedQueries(AsyncObjectFactories, SavedQueries):
+    pass
+
+
+class AsyncAssets(Assets):
+    async def export(
+        self,
+        path: Union[Path, str, BinaryIO],
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> None:
+        """Export all assets into an importable ZIP file. See Assets.export."""
+        response = await self.client.get(self.export_url, stream=True)
+        await write_export(response, path, progress=progress)
+
+    async def import_file(
+        self,
+        file_path: Upload,
+        passwords=None,
+        file_name: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """Import a file on remote. See Assets.import_file."""
+        if isinstance(file_path, (str, Path)) and not Path(file_path).exists():
+            return False
+        with open_upload(file_path, file_name) as (file_name, f):
+            body = self._import_body(f, file_name, passwords, progress)
+            headers = AsyncObjectFactories._upload_headers(body)
+            response = await self.client.post(self.import_url, content=body, headers=headers)
+        raise_for_status(response)
+
+        # If import is successful, the following is returned: {'message': 'OK'}
+        return response.json().get("message") == "OK"
+
+
+class AsyncQuery(Query):
+    """Awaitable counterpart of Query, see AsyncSupersetClient.submit."""
+
+    async def refresh(self) -> str:
+        """Fetch the status of the query, and return it."""
+        if not self.done:
+            response = await self.client.get(self.url, headers=NO_CACHE)
+            raise_for_status(response)
+            self._update(response.json()["result"])
+        return self.status
+
+    async def wait(self, timeout: Optional[float] = None, poll_interval: float = 0.5, max_poll_interval: float = 10) -> str:
+        """Wait for the query to finish, and return its final status. See Query.wait."""
+        delays = self._poll_delays(timeout, poll_interval, max_poll_interval)
+        while await self.refresh() not in FINISHED_STATES:
+            await asyncio.sleep(next(delays))
+        return self.status
+
+    async def cancel(self) -> str:
+        """Stop the query, unless it already finished, and return its status. See Query.cancel."""
+        if not self.done:
+            response = await self.client.post(self.stop_url, json={"client_id": self.client_id})
+            raise_for_status(response)
+            await self.refresh()
+        return self.status
+
+    async def result(self, timeout: Optional[float] = None):
+        """Wait for the query to finish, and return the resulting dataset. See Query.result."""
+        await self.wait(timeout)
+        self._check_success()
+        if self._result is not None:
+            return self.client._sql_result(self._result)
+        response = await self.client.get(self.results_url, params=self._results_params())
+        raise_for_status(response)
+        return self.client._sql_result(response.json())
+
+    async def iter_rows(self, batch_size: Optional[int] = None, timeout: Optional[float] = None) -> AsyncIterator:
+        """Wait for the query to finish, and yield the rows of the resulting dataset. See Query.iter_rows."""
+        await self.wait(timeout)
+        self._check_success()
+        result = {}
+        rows = self._iter_rows(result)
+        async for item in abatched(rows, batch_size) if batch_size else rows:
+            yield item
+        self.client._check_query_limit(result)
+
+    async def _iter_rows(self, result: dict) -> AsyncIterator[dict]:
+        if self._result is not None:
+            result.update(self._result)
+            for row in self._result["data"]:
+                yield row
+            return
+        response = await self.client.get(self.results_url, params=self._results_params(), stream=True)
+        async for row in self.client._iter_result_rows(response, result):
+            yield row
+
+
+class AsyncSupersetClient(SupersetClient):
+    """An asyncio Superset Client.
+
+    Factories mirror the ones of SupersetClient, but every method performing a
+    request is a coroutine. Requires httpx.
+
+    At most max_concurrency requests are in flight at once, whatever the number
+    of concurrent tasks. When the access token expires, a single task refreshes
+    it while the others wait, then every rejected request is replayed.
+
+        async with AsyncSupersetClient(host, "admin", "admin") as client:
+            dashboards = await client.dashboards.find()
+            await asyncio.gather(*(d.save() for d in dashboards))
+    """
+
+    assets_cls = AsyncAssets
+    dashboards_cls = AsyncDashboards
+    charts_cls = AsyncCharts
+    datasets_cls = AsyncDatasets
+    databases_cls = AsyncDatabases
+    saved_queries_cls = AsyncSavedQueries
+
+    def __init__(
+        self,
+        host,
+        username=None,
+        password=None,
+        provider="db",
+        verify=True,
+        max_concurrency=10,
+        timeout=30.0,
+        token_refresh_leeway=30,
+    ):
+        if httpx is None:
+            raise ImportError("AsyncSupersetClient requires httpx: pip install superset-api-client[async]")
+        super().__init__(
+            host,
+            username=username,
+            password=password,
+            provider=provider,
+            verify=verify,
+            token_refresh_leeway=token_refresh_leeway,
+        )
+        self.verify = verify
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._token = None
+        self._csrf_token = None
+        # Created within the running event loop
+        self._auth_lock = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying connections."""
+        if "session" in self.__dict__:
+            await self.session.aclose()
+
+    @cached_property
+    def session(self):
+        return httpx.AsyncClient(
+            verify=self.verify,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency),
+            follow_redirects=True,
+            headers={"Referer": f"{self.base_url}"},
+        )
+
+    def _headers(self, headers: Optional[dict] = None) -> dict:
+        headers = dict(headers or {})
+        headers["Authorization"] = f"Bearer {self._token['access_token']}"
+        if self._csrf_token:
+            headers["X-CSRFToken"] = self._csrf_token
+        return headers
+
+    async def _ensure_authenticated(self, method: str) -> None:
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._token is None:
+            async with self._auth_lock:
+                if self._token is None:
+                    self._token = await self.authenticate()
+        # The CSRF token is only fetched once a request requires it
+        if self._csrf_token is None and method.upper() not in SAFE_METHODS:
+            async with self._auth_lock:
+                if self._csrf_token is None:
+                    self._csrf_token = await self.csrf_token(self.session)
+
+    async def authenticate(self) -> dict:
+        response = await self.session.post(self.login_endpoint, json=self._login_payload())
+        raise_for_status(response)
+        return response.json()
+
+    async def csrf_token(self, session) -> str:
+        # Get CSRF Token
+        csrf_response = await session.get(self.csrf_endpoint, headers=self._headers())
+        raise_for_status(csrf_response)  # Check CSRF Token went well
+        return csrf_response.json().get("result")
+
+    @staticmethod
+    def _token_expired(response) -> bool:
+        if response.status_code != 401:
+            return False
+        try:
+            return response.json().get("msg") == "Token has expired"
+        except ValueError:
+            return False
+
+    async def refresh_access_token(self, expired_access_token: Optional[str] = None) -> str:
+        """Get a new access token using the refresh token, and return it.
+
+        Skipped when another task already refreshed expired_access_token.
+        """
+        async with self._auth_lock:
+            token = self._token
+            if expired_access_token is not None and token["access_token"] != expired_access_token:
+                return token["access_token"]
+
+            refresh_token = token["refresh_token"]
+            response = await self.session.post(
+                self.refresh_endpoint,
+                headers={"Authorization": f"Bearer {refresh_token}"},
+            )
+            raise_for_status(response)
+
+            new_token = response.json()
+            if "refresh_token" not in new_token:
+                new_token["refresh_token"] = refresh_token
+            self._token = new_token
+            return new_token["access_token"]
+
+    async def _send(self, method: str, url: str, headers: Optional[dict] = None, stream: bool = False, **kwargs):
+        request = self.session.build_request(method, url, headers=self._headers(headers), **kwargs)
+        response = await self.session.send(request, stream=stream)
+        if stream and response.status_code == 401:
+            # Read the body to check whether the token expired
+            await response.aread()
+        return response
+
+    async def request(self, method: str, url: str, headers: Optional[dict] = None, stream: bool = False, **kwargs):
+        """Send an authenticated request.
+
+        With stream=True the body is not read: iterate over it with
+        response.aiter_bytes(), then close the response with response.aclose().
+        """
+        await self._ensure_authenticated(method)
+        async with self._semaphore:
+            access_token = self._token["access_token"]
+            if self.token_refresh_leeway is not None:
+                expiry = jwt_expiry(access_token)
+                if expiry is not None and expiry - time.time() < self.token_refresh_leeway:
+                    access_token = await self.refresh_access_token(access_token)
+            response = await self._send(method, url, headers=headers, stream=stream, **kwargs)
+            if self._token_expired(response):
+                await response.aclose()
+                await self.refresh_access_token(access_token)
+                response = await self._send(method, url, headers=headers, stream=stream, **kwargs)
+        return response
+
+    # Method shortcuts
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def run(self, database_id, query, query_limit=None, output=None):
+        """Sends SQL queries to Superset and returns the resulting dataset.
+
+        See SupersetClient.run.
+        """
+        if output is not None:
+            columnar.require(output)
+            result = {}
+            buffer = columnar.ColumnBuffer()
+            async for row in self._iter_sql_rows(database_id, query, result, query_limit=query_limit):
+                buffer.append(row)
+            self._check_query_limit(result)
+            return buffer.build(result.get("columns", []), output)
+
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        response = await self.post(self._sql_endpoint, json=payload)
+        raise_for_status(response)
+        return self._sql_result(response.json())
+
+    async def submit(self, database_id, query, query_limit=None) -> AsyncQuery:
+        """Submits a SQL query to be run asynchronously by SQL Lab.
+
+        See SupersetClient.submit.
+        """
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        payload.update(runAsync=True, client_id=self._query_client_id())
+        response = await self.post(self._sql_endpoint, json=payload)
+        raise_for_status(response)
+        return AsyncQuery.from_response(self, payload["client_id"], response.json())
+
+    async def iter_run(
+        self,
+        database_id,
+        query,
+        query_limit=None,
+        batch_size=None,
+        chunk_size=None,
+        order_by=None,
+        keyset=False,
+        max_workers=1,
+    ) -> AsyncIterator:
+        """Sends SQL queries to Superset and yields the rows of the resulting dataset.
+
+        See SupersetClient.iter_run.
+        """
+        if chunk_size:
+            rows = self._iter_chunked_rows(database_id, query, chunk_size, order_by, keyset, max_workers)
+            if query_limit:
+                rows = self._alimit(rows, query_limit)
+            async for item in abatched(rows, batch_size) if batch_size else rows:
+                yield item
+            return
+
+        result = {}
+        rows = self._iter_sql_rows(database_id, query, result, query_limit=query_limit)
+        async for item in abatched(rows, batch_size) if batch_size else rows:
+            yield item
+        self._check_query_limit(result)
+
+    async def _iter_chunked_rows(
+        self, database_id, query, chunk_size, order_by=None, keyset=False, max_workers=1
+    ) -> AsyncIterator[dict]:
+        if not order_by:
+            # Rows of unordered queries may be returned in a different order by each chunk
+            raise ValueError("Chunked queries require order_by")
+        if keyset:
+            last_row = None
+            while True:
+                after = None if last_row is None else last_row[order_by]
+                _, rows = await self.run(database_id, self._chunk_query(query, chunk_size, order_by=order_by, after=after))
+                for row in rows:
+                    yield row
+                if len(rows) < chunk_size:
+                    return
+                last_row = rows[-1]
+
+        async def run_chunk(index):
+            chunk_query = self._chunk_query(query, chunk_size, order_by=order_by, offset=index * chunk_size)
+            return (await self.run(database_id, chunk_query))[1]
+
+        chunks = aprefetch(run_chunk, itertools.count(), max_workers=max_workers)
+        try:
+            async for rows in chunks:
+                for row in rows:
+                    yield row
+                if len(rows) < chunk_size:
+                    return
+        finally:
+            await chunks.aclose()
+
+    @staticmethod
+    async def _alimit(items: AsyncIterable, limit: int) -> AsyncIterator:
+        count = 0
+        async for item in items:
+            yield item
+            count += 1
+            if count >= limit:
+                return
+
+    async def _iter_sql_rows(self, database_id, query, result: dict, query_limit=None) -> AsyncIterator[dict]:
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        response = await self.post(self._sql_endpoint, json=payload, stream=True)
+        async for row in self._iter_result_rows(response, result):
+            yield row
+
+    @staticmethod
+    async def _iter_result_rows(response, result: dict) -> AsyncIterator[dict]:
+        """Yield the rows of a streamed query result response. See SupersetClient._iter_result_rows."""
+        try:
+            if response.status_code >= 400:
+                # Read the error message
+                await response.aread()
+            raise_for_status(response)
+            async for key, value in aiterparse(response.aiter_bytes(chunk_size=SQL_CHUNK_SIZE), "data"):
+                if key == "data":
+                    yield value
+                else:
+                    result[key] = value
+        finally:
+            await response.aclose()
@@ -1,6 +1,13 @@
 """Base classes."""
+import collections
+import contextlib
 import dataclasses
+import itertools
 import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from functools import cached_property
@@ -9,20 +16,57 @@ except ImportError:  # pragma: no cover
     from cached_property import cached_property
 
 import json
+import math
 import os.path
 from pathlib import Path
-from typing import List, Union
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 import yaml
-from requests import HTTPError
+from requests import HTTPError, RequestException
 
+from supersetapiclient.cache import MemoryCache
 from supersetapiclient.exceptions import BadRequestError, ComplexBadRequestError, MultipleFound, NotFound
+from supersetapiclient.multipart import MultipartEncoder, Upload, open_upload
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks of streamed downloads
+CHUNK_SIZE = 1024 * 1024
+
+
+class JSONField:
+    """Descriptor of an object field holding JSON text, only decoded on first access.
+
+    The text is kept as received in the _raw_json dict of the object, and the
+    decoded value in its __dict__ once the field is read or assigned.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj.__dict__[self.name]
+        except KeyError:
+            pass
+        value = obj.__dict__[self.name] = json.loads(obj.__dict__["_raw_json"][self.name])
+        return value
+
+    def __set__(self, obj, value):
+        if value is self:
+            # Default value of the dataclass field
+            value = None
+        if value is None or isinstance(value, str):
+            obj.__dict__.setdefault("_raw_json", {})[self.name] = value or "{}"
+            obj.__dict__.pop(self.name, None)
+        else:
+            obj.__dict__[self.name] = value
+
 
 def json_field():
-    return dataclasses.field(default=None, repr=False)
+    return dataclasses.field(default=JSONField(), repr=False)
 
 
 def default_string():
@@ -33,16 +77,148 @@ def raise_for_status(response):
     try:
         response.raise_for_status()
     except HTTPError as e:
-        # Attempt to propagate the server error message
+        raise_http_error(e, response)
+
+
+def raise_http_error(e: HTTPError, response):
+    """Raise an HTTP error, propagating the server error message if any."""
+    # Attempt to propagate the server error message
+    try:
+        error_msg = response.json()["message"]
+    except Exception:
         try:
-            error_msg = response.json()["message"]
+            errors = response.json()["errors"]
         except Exception:
-            try:
-                errors = response.json()["errors"]
-            except Exception:
-                raise e
-            raise ComplexBadRequestError(*e.args, request=e.request, response=e.response, errors=errors) from None
-        raise BadRequestError(*e.args, request=e.request, response=e.response, message=error_msg) from None
+            raise e
+        raise ComplexBadRequestError(*e.args, request=e.request, response=e.response, errors=errors) from None
+    raise BadRequestError(*e.args, request=e.request, response=e.response, message=error_msg) from None
+
+
+def prefetch(func: Callable, items: Iterable, max_workers: int = 1) -> Iterator:
+    """Map func over items, running up to max_workers calls ahead of the consumer.
+
+    Results are yielded in the order of items. With max_workers <= 1 calls are
+    made lazily, one at a time. Closing the iterator early cancels pending calls.
+    """
+    items = iter(items)
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = collections.deque()
+    try:
+        for item in itertools.islice(items, max_workers):
+            pending.append(executor.submit(func, item))
+        while pending:
+            result = pending.popleft().result()
+            # Keep the pool busy while the caller consumes this result
+            for item in itertools.islice(items, 1):
+                pending.append(executor.submit(func, item))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    """Group items in lists of up to size items."""
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextlib.contextmanager
+def open_target(target: Union[Path, str, BinaryIO]) -> Iterator[BinaryIO]:
+    """Open target for binary writing, unless it is a file object already."""
+    if hasattr(target, "write"):
+        yield target
+        return
+    with open(target, "wb") as f:
+        yield f
+
+
+def content_length(response) -> Optional[int]:
+    length = response.headers.get("content-length")
+    return int(length) if length else None
+
+
+def write_chunks(
+    chunks: Iterable[bytes],
+    target: Union[Path, str, BinaryIO],
+    total: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> int:
+    """Write chunks to target, a path or a binary file object.
+
+    progress, if given, is called after each chunk with the number of bytes
+    written so far and total.
+
+    Returns:
+        int: the number of bytes written
+    """
+    written = 0
+    with open_target(target) as f:
+        for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+            if progress is not None:
+                progress(written, total)
+    return written
+
+
+@dataclasses.dataclass
+class BatchResult:
+    """Outcome of a bulk operation.
+
+    Attributes:
+        results (list): one result per item, in the order of items (None for
+            failed items)
+        errors (dict): exceptions raised by failed items, by item index
+        elapsed (float): duration of the operation, in seconds
+    """
+
+    results: list = dataclasses.field(default_factory=list)
+    errors: Dict[int, Exception] = dataclasses.field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether all items succeeded."""
+        return not self.errors
+
+    @property
+    def throughput(self) -> float:
+        """Processed items per second."""
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+
+def run_batch(func: Callable, items: Iterable, max_workers: int = 1) -> BatchResult:
+    """Call func on each item with up to max_workers concurrent calls.
+
+    Failures are collected in the result instead of aborting the batch.
+    """
+
+    def call(item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    start = time.perf_counter()
+    result = BatchResult()
+    for i, (value, error) in enumerate(prefetch(call, items, max_workers=max_workers)):
+        result.results.append(value)
+        if error is not None:
+            logger.warning("Item %d of batch failed: %s", i, error)
+            result.errors[i] = error
+    result.elapsed = time.perf_counter() - start
+    return result
 
 
 class Object:
@@ -63,18 +239,31 @@ class Object:
     def from_json(cls, json: dict):
         """Create Object from json
 
+        Fields missing from json (e.g. when only some columns were requested)
+        keep their default value, or None for fields without a default.
+
         Args:
             json (dict): a dictionary
 
         Returns:
             Object: return the related object
         """
-        field_names = cls.field_names()
-        return cls(**{k: v for k, v in json.items() if k in field_names})
+        kwargs = {}
+        for f in cls.fields():
+            if f.name in json:
+                kwargs[f.name] = json[f.name]
+            elif f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+                kwargs[f.name] = None
+        return cls(**kwargs)
 
     def to_json(self, columns):
         o = {}
+        raw_json = self.__dict__.get("_raw_json", {})
         for c in columns:
+            if c in self.JSON_FIELDS and c not in self.__dict__ and c in raw_json:
+                # Never decoded, so unchanged: send the text as received
+                o[c] = raw_json[c]
+                continue
             if not hasattr(self, c):
                 # Column that is not implemented yet
                 continue
@@ -85,44 +274,116 @@ class Object:
         return o
 
     def __post_init__(self):
-        for f in self.JSON_FIELDS:
-            setattr(self, f, json.loads(getattr(self, f) or "{}"))
+        # Field values as last loaded from or saved to the server
+        self._loaded = {}
+
+    def _snapshot(self, name: str):
+        """Get a fingerprint of the value of a field, compared to detect changes."""
+        if name in self.JSON_FIELDS:
+            if name in self.__dict__:
+                return json.dumps(self.__dict__[name])
+            return self._raw_json[name]
+        value = getattr(self, name)
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        # Cheaper than a deep copy, for lists and dicts received from the server
+        return json.dumps(value, sort_keys=True, default=str)
+
+    def _mark_clean(self, names: Optional[Iterable[str]] = None) -> None:
+        """Record the current value of fields (all by default) as known by the server."""
+        field_names = self.field_names()
+        for name in field_names if names is None else names:
+            if name in field_names:
+                self._loaded[name] = self._snapshot(name)
+
+    def changed_fields(self) -> List[str]:
+        """Get the names of fields modified since the object was loaded or saved.
+
+        All fields are returned for objects that were not loaded from the server.
+        """
+        changed = []
+        for f in self.fields():
+            name = f.name
+            if name not in self._loaded:
+                changed.append(name)
+            elif name in self.JSON_FIELDS:
+                # Fields that were never decoded can't have been modified
+                if name in self.__dict__ and self.__dict__[name] != json.loads(self._loaded[name]):
+                    changed.append(name)
+                elif name not in self.__dict__ and self._raw_json[name] != self._loaded[name]:
+                    changed.append(name)
+            elif self._snapshot(name) != self._loaded[name]:
+                changed.append(name)
+        return changed
 
     @property
     def base_url(self) -> str:
         return self._parent.client.join_urls(self._parent.base_url, self.id)
 
-    def export(self, path: Union[Path, str]) -> None:
+    def export(self, path: Union[Path, str, BinaryIO], progress: Optional[Callable] = None) -> None:
         """Export object to path"""
-        self._parent.export(ids=[self.id], path=path)
+        return self._parent.export(ids=[self.id], path=path, progress=progress)
 
-    def fetch(self) -> None:
-        """Fetch additional object information."""
+    def update_from_json(self, json: dict) -> None:
+        """Update object fields from an api response."""
         field_names = self.field_names()
-
-        client = self._parent.client
-        response = client.get(self.base_url)
-        o = response.json().get("result")
-        for k, v in o.items():
+        for k, v in json.items():
             if k in field_names:
-                if k in self.JSON_FIELDS:
-                    setattr(self, k, json.loads(v or "{}"))
-                else:
-                    setattr(self, k, v)
+                setattr(self, k, v)
+        self._mark_clean(json)
+
+    def fetch(self) -> None:
+        """Fetch additional object information."""
+        return self._parent.fetch(self)
 
     def save(self) -> None:
         """Save object information."""
-        o = self.to_json(columns=self._parent.edit_columns)
-        response = self._parent.client.put(self.base_url, json=o)
-        raise_for_status(response)
+        return self._parent.save(self)
 
     def delete(self) -> bool:
         return self._parent.delete(id=self.id)
 
 
+class IdentityMap:
+    """Weak references to the objects loaded by a client, keyed by type and id.
+
+    Objects are dropped from the map once nothing else references them.
+    """
+
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, cls: type, id: int) -> Optional[Object]:
+        with self._lock:
+            return self._objects.get((cls, id))
+
+    def add(self, obj: Object) -> Object:
+        """Add obj, unless an object with the same type and id is mapped already.
+
+        Returns:
+            Object: the mapped object
+        """
+        with self._lock:
+            return self._objects.setdefault((type(obj), obj.id), obj)
+
+    def remove(self, cls: type, id: int) -> None:
+        with self._lock:
+            self._objects.pop((cls, id), None)
+
+    def __len__(self):
+        return len(self._objects)
+
+
+# Object metadata (/_info) shared by clients of this process
+INFO_CACHE = MemoryCache(ttl=3600)
+
+
 class ObjectFactories:
     endpoint = ""
     base_object: Object = None
+    # Whether the endpoint supports deleting many objects in one request
+    bulk_delete = True
 
     _INFO_QUERY = {"keys": ["add_columns", "edit_columns"]}
 
@@ -136,11 +397,33 @@ class ObjectFactories:
 
     @cached_property
     def _infos(self):
+        infos = self._cached_infos()
+        if infos is not None:
+            return infos
+
         # Get infos
         response = self.client.get(self.info_url, params={"q": json.dumps(self._INFO_QUERY)})
 
         raise_for_status(response)
-        return response.json()
+        return self._store_infos(response.json())
+
+    def _get_infos(self) -> dict:
+        """Load the infos of the endpoint, once."""
+        return self._infos
+
+    @property
+    def _infos_key(self) -> str:
+        return f"info:{self.client.host}:{self.client.superset_version or ''}:{self.endpoint}"
+
+    def _cached_infos(self) -> Optional[dict]:
+        if self.client.info_cache is None:
+            return None
+        return self.client.info_cache.get(self._infos_key)
+
+    def _store_infos(self, infos: dict) -> dict:
+        if self.client.info_cache is not None:
+            self.client.info_cache.set(self._infos_key, infos)
+        return infos
 
     @property
     def add_columns(self):
@@ -167,43 +450,186 @@ class ObjectFactories:
     def export_url(self):
         return self.client.join_urls(self.base_url, "export/")
 
-    def get(self, id: int):
-        """Get an object by id."""
+    @staticmethod
+    def _columns(columns: Optional[List[str]]) -> Optional[List[str]]:
+        # Always request the id so partial objects can be completed with fetch()
+        if columns and "id" not in columns:
+            return ["id", *columns]
+        return columns
+
+    def get(self, id: int, columns: Optional[List[str]] = None):
+        """Get an object by id.
+
+        Args:
+            id (int): object id
+            columns (list, optional): only request these columns. The returned
+                object is partially populated, call fetch() to complete it.
+        """
         url = self.client.join_urls(self.base_url, id)
-        response = self.client.get(url)
+        response = self.client.get(url, params=self._get_params(columns))
         raise_for_status(response)
         response = response.json()
 
         object_json = response.get("result")
         object_json["id"] = id
-        object = self.base_object.from_json(object_json)
-        object._parent = self
+        return self._object_from_json(object_json)
+
+    def _get_params(self, columns: Optional[List[str]] = None) -> dict:
+        if columns:
+            return {"q": json.dumps({"columns": self._columns(columns)})}
+        return {}
+
+    def _object_from_json(self, json: dict) -> Object:
+        identity_map = self.client.identity_map
+        if identity_map is not None and json.get("id") is not None:
+            o = identity_map.get(self.base_object, json["id"])
+            if o is not None:
+                o.update_from_json(json)
+                return o
+
+        o = self.base_object.from_json(json)
+        o._parent = self
+        o._mark_clean()
+        return self._register(o)
+
+    def _register(self, obj: Object) -> Object:
+        """Add obj to the identity map of the client, if any, and return the mapped object."""
+        if self.client.identity_map is None or obj.id is None:
+            return obj
+        return self.client.identity_map.add(obj)
+
+    def _forget(self, id: int) -> None:
+        if self.client.identity_map is not None:
+            self.client.identity_map.remove(self.base_object, id)
+
+    def _find_page(self, filters: list, page_size: int, page: int, columns: Optional[List[str]] = None):
+        """Get one page of objects and the total number of matching objects."""
+        params = self._find_params(filters, page_size=page_size, page=page, columns=columns)
+        response = self.client.get(self.base_url, params=params)
+        raise_for_status(response)
+        response = response.json()
 
-        return object
+        objects = [self._object_from_json(r) for r in response.get("result")]
+        return response.get("count", 0), objects
 
-    def find(self, page_size: int = 100, page: int = 0, **kwargs):
-        """Find and get objects from api."""
-        # Get response
+    def _find_params(self, filters: list, page_size: int, page: int, columns: Optional[List[str]] = None) -> dict:
         query = {
             "page_size": page_size,
             "page": page,
-            "filters": [{"col": k, "opr": "eq", "value": v} for k, v in kwargs.items()],
+            "filters": filters,
         }
+        if columns:
+            query["columns"] = self._columns(columns)
 
-        params = {"q": json.dumps(query)}
+        return {"q": json.dumps(query)}
 
-        response = self.client.get(self.base_url, params=params)
-        raise_for_status(response)
-        response = response.json()
+    @staticmethod
+    def _eq_filters(kwargs: dict) -> list:
+        return [{"col": k, "opr": "eq", "value": v} for k, v in kwargs.items()]
 
-        objects = []
-        for r in response.get("result"):
-            o = self.base_object.from_json(r)
-            o._parent = self
-            objects.append(o)
+    def find(self, page_size: int = 100, page: int = 0, columns: Optional[List[str]] = None, **kwargs):
+        """Find and get objects from api.
 
+        If columns is given, only these columns are requested and the returned
+        objects are partially populated. Call fetch() on an object to complete it.
+        """
+        _, objects = self._find_page(self._eq_filters(kwargs), page_size=page_size, page=page, columns=columns)
         return objects
 
+    def iter_find(
+        self,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+        **kwargs,
+    ) -> Iterator[Object]:
+        """Lazily iterate over all objects matching the filters, page by page.
+
+        Objects are yielded as soon as their page arrives, and only one page is
+        held in memory at a time. The number of pages is derived from the
+        ``count`` returned with the first page, and from its length when the
+        server serves smaller pages than page_size.
+
+        With max_workers > 1, up to max_workers following pages are fetched
+        concurrently while the current one is consumed. Objects are still
+        yielded in order.
+
+        columns restricts the requested columns, as for find().
+        """
+        return self._iter_filtered(self._eq_filters(kwargs), page_size=page_size, max_workers=max_workers, columns=columns)
+
+    def _iter_filtered(
+        self,
+        filters: list,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+    ) -> Iterator[Object]:
+        count, objects = self._find_page(filters, page_size=page_size, page=0, columns=columns)
+        yield from objects
+        page_size = self._served_page_size(count, objects, page_size)
+
+        def get_page(page):
+            return self._find_page(filters, page_size=page_size, page=page, columns=columns)[1]
+
+        pages = math.ceil(count / page_size)
+        for objects in prefetch(get_page, range(1, pages), max_workers=max_workers):
+            if not objects:
+                # Objects were deleted while iterating
+                return
+            yield from objects
+
+    @staticmethod
+    def _served_page_size(count: int, first_page: list, page_size: int) -> int:
+        """Get the size of the pages served, given the first one.
+
+        Superset caps page sizes (FAB_API_MAX_PAGE_SIZE, 100 by default): a
+        short first page while more objects match reveals the actual size.
+        """
+        if first_page and len(first_page) < min(page_size, count):
+            return len(first_page)
+        return page_size
+
+    def find_all(
+        self,
+        page_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+        **kwargs,
+    ) -> List[Object]:
+        """Find all objects matching the filters, across every page."""
+        return list(self.iter_find(page_size=page_size, max_workers=max_workers, columns=columns, **kwargs))
+
+    def get_many(
+        self,
+        ids: Iterable[int],
+        chunk_size: int = 100,
+        max_workers: int = 1,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[int, Object]:
+        """Get many objects by id, using as few requests as possible.
+
+        Ids are looked up in chunks of chunk_size with an ``in`` filter, which
+        keeps request urls reasonably short. Chunks larger than the pages
+        served by Superset are fetched in several pages. Up to max_workers
+        chunks are fetched concurrently.
+
+        Returns:
+            dict: objects keyed by id, in the order of ids. Ids that were not
+            found are missing from the result.
+        """
+        ids = list(dict.fromkeys(ids))
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+        def get_chunk(chunk):
+            filters = [{"col": "id", "opr": "in", "value": chunk}]
+            return list(self._iter_filtered(filters, page_size=len(chunk), columns=columns))
+
+        found = {}
+        for objects in prefetch(get_chunk, chunks, max_workers=max_workers):
+            found.update((o.id, o) for o in objects)
+        return {i: found[i] for i in ids if i in found}
+
     def count(self):
         """Count objects."""
         response = self.client.get(self.base_url)
@@ -219,6 +645,46 @@ class ObjectFactories:
             raise MultipleFound(f"Multiple {self.base_object.__name__} found")
         return objects[0]
 
+    def fetch(self, obj) -> None:
+        """Fetch additional object information."""
+        response = self.client.get(obj.base_url)
+        raise_for_status(response)
+        obj.update_from_json(response.json().get("result"))
+
+    def save(self, obj) -> None:
+        """Save object information.
+
+        Only fields modified since the object was loaded are sent, and nothing
+        is sent when no field was modified.
+        """
+        o = self._save_payload(obj)
+        if not o:
+            return
+        response = self.client.put(obj.base_url, json=o)
+        raise_for_status(response)
+        obj._mark_clean(o)
+
+    def save_many(self, objects: Iterable[Object], max_workers: int = 4) -> BatchResult:
+        """Save objects, with up to max_workers concurrent requests.
+
+        A failed save does not abort the others: check the errors of the
+        returned result, whose results are the saved objects.
+        """
+        # Load the editable columns once, rather than in every worker
+        self._get_infos()
+
+        def save(obj):
+            self.save(obj)
+            return obj
+
+        return run_batch(save, objects, max_workers=max_workers)
+
+    def _save_payload(self, obj) -> dict:
+        changed = obj.changed_fields()
+        o = obj.to_json(columns=[c for c in self.edit_columns if c in changed])
+        # to_json may add fields of its own
+        return {k: v for k, v in o.items() if k in changed}
+
     def add(self, obj) -> int:
         """Create an object on remote."""
 
@@ -227,32 +693,70 @@ class ObjectFactories:
         raise_for_status(response)
         obj.id = response.json().get("id")
         obj._parent = self
+        obj._mark_clean()
+        self._register(obj)
         return obj.id
 
-    def export(self, ids: List[int], path: Union[Path, str]) -> None:
-        """Export object into an importable file"""
+    def add_many(self, objects: Iterable[Object], max_workers: int = 4) -> BatchResult:
+        """Create objects on remote, with up to max_workers concurrent requests.
+
+        The ids of created objects are set. A failed creation does not abort
+        the others: check the errors of the returned result, whose results are
+        the created objects.
+        """
+        # Load the columns once, rather than in every worker
+        self._get_infos()
+
+        def add(obj):
+            self.add(obj)
+            return obj
+
+        return run_batch(add, objects, max_workers=max_workers)
+
+    def export(
+        self,
+        ids: List[int],
+        path: Union[Path, str, BinaryIO],
+        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    ) -> None:
+        """Export object into an importable file.
+
+        The export is streamed to path, which may also be a binary file object
+        (e.g. sys.stdout.buffer). progress, if given, is called with the number
+        of bytes written and the total size (None if unknown) after each chunk.
+        """
+        with self.client.get(self.export_url, params=self._ids_params(ids), stream=True) as response:
+            raise_for_status(response)
+            self._write_export(response, path, progress=progress)
+
+    @staticmethod
+    def _ids_params(ids: List[int]) -> dict:
         ids_array = ",".join([str(i) for i in ids])
-        response = self.client.get(self.export_url, params={"q": f"[{ids_array}]"})
+        return {"q": f"[{ids_array}]"}
 
-        raise_for_status(response)
+    @staticmethod
+    def _write_export(response, path: Union[Path, str, BinaryIO], progress: Optional[Callable] = None) -> None:
+        content_type = response.headers["content-type"].strip()
+        if content_type.startswith("application/zip"):
+            chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+            write_chunks(chunks, path, total=content_length(response), progress=progress)
+            return
+        ObjectFactories._write_legacy_export(response, path)
 
+    @staticmethod
+    def _write_legacy_export(response, path: Union[Path, str, BinaryIO]) -> None:
         content_type = response.headers["content-type"].strip()
         if content_type.startswith("application/text"):  # pragma: no cover
             # Superset 1.x
             data = yaml.load(response.text, Loader=yaml.FullLoader)
-            with open(path, "w", encoding="utf-8") as f:
-                yaml.dump(data, f, default_flow_style=False)
+            with open_target(path) as f:
+                f.write(yaml.dump(data, default_flow_style=False).encode("utf-8"))
             return
         if content_type.startswith("application/json"):  # pragma: no cover
             # Superset 1.x
             data = response.json()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-            return
-        if content_type.startswith("application/zip"):
-            data = response.content
-            with open(path, "wb") as f:
-                f.write(data)
+            with open_target(path) as f:
+                f.write(json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8"))
             return
         raise ValueError(f"Unknown content type {content_type}")
 
@@ -261,32 +765,88 @@ class ObjectFactories:
         url = self.client.join_urls(self.base_url, id)
         response = self.client.delete(url)
         raise_for_status(response)
+        self._forget(id)
         return response.json().get("message") == "OK"
 
-    def import_file(self, file_path, overwrite=False, passwords=None) -> dict:
+    @staticmethod
+    def _import_body(f, file_name: str, overwrite=False, passwords=None, progress=None) -> MultipartEncoder:
+        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
+        file_ext = os.path.splitext(file_name)[-1].lstrip(".").lower()
+        fields = [
+            ("overwrite", json.dumps(overwrite)),
+            ("formData", (file_name, f, f"application/{file_ext}")),
+            ("passwords", json.dumps(passwords)),
+        ]
+        return MultipartEncoder(fields, progress=progress)
+
+    def delete_many(self, ids: Iterable[int], chunk_size: int = 100, max_workers: int = 1) -> BatchResult:
+        """Delete objects by id, with bulk requests of up to chunk_size ids.
+
+        When the server rejects a bulk request, e.g. because one of the objects
+        does not exist, the objects of that chunk are deleted one by one so that
+        errors are reported per id. Chunks are deleted by up to max_workers
+        concurrent requests.
+        """
+        ids = list(ids)
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+        start = time.perf_counter()
+        result = BatchResult()
+        for chunk_result in prefetch(self._delete_chunk, chunks, max_workers=max_workers):
+            offset = len(result.results)
+            result.results.extend(chunk_result.results)
+            result.errors.update((offset + i, e) for i, e in chunk_result.errors.items())
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _delete_chunk(self, ids: List[int]) -> BatchResult:
+        if not self.bulk_delete or len(ids) == 1:
+            return run_batch(self.delete, ids)
+        try:
+            response = self.client.delete(self.base_url, params=self._ids_params(ids))
+            raise_for_status(response)
+        except RequestException as e:
+            # Connection errors and timeouts fail the chunk, not the whole batch
+            if e.response is None or not 400 <= e.response.status_code < 500:
+                logger.warning("Bulk delete of %d objects failed: %s", len(ids), e)
+                return BatchResult(results=[None] * len(ids), errors=dict.fromkeys(range(len(ids)), e))
+            if e.response.status_code == 405:
+                self.bulk_delete = False
+            logger.info("Bulk delete rejected, deleting %d objects one by one: %s", len(ids), e)
+            return run_batch(self.delete, ids)
+        for id in ids:
+            self._forget(id)
+        return BatchResult(results=[True] * len(ids))
+
+    def import_file(
+        self,
+        file_path: Upload,
+        overwrite=False,
+        passwords=None,
+        file_name: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
         """Import a file on remote.
 
-        :param file_path: Path to a JSON or ZIP file containing the import data
+        The file is streamed from disk rather than loaded in memory.
+
+        :param file_path: Path to a JSON or ZIP file containing the import data,
+        or its content as bytes or a binary file object
         :param overwrite: If True, overwrite existing remote entities
         :param passwords: JSON map of passwords for each featured database in
         the file. If the ZIP includes a database config in the path
         databases/MyDatabase.yaml, the password should be provided in the
         following format: {"MyDatabase": "my_password"}
+        :param file_name: Name of the uploaded file, defaults to the name of
+        file_path
+        :param progress: Called with the number of bytes sent and the total
         """
-        data = {"overwrite": json.dumps(overwrite)}
-        passwords = {f"databases/{db}.yaml": pwd for db, pwd in (passwords or {}).items()}
-        file_name = os.path.split(file_path)[-1]
-        file_ext = os.path.splitext(file_name)[-1].lstrip(".").lower()
-        with open(file_path, "rb") as f:
-            files = {
-                "formData": (file_name, f, f"application/{file_ext}"),
-                "passwords": (None, json.dumps(passwords), None),
-            }
+        with open_upload(file_path, file_name) as (file_name, f):
+            body = self._import_body(f, file_name, overwrite, passwords, progress)
             response = self.client.post(
                 self.import_url,
-                files=files,
-                data=data,
-                headers={"Accept": "application/json"},
+                data=body,
+                headers={"Accept": "application/json", "Content-Type": body.content_type},
             )
         raise_for_status(response)
 
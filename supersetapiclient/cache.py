@@ -0,0 +1,165 @@
+"""Caches."""
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+class MemoryCache:
+    """A thread-safe in-memory cache.
+
+    Args:
+        ttl (float, optional): time to live of entries, in seconds
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache:
+    """A cache storing JSON serializable values as files in a directory.
+
+    Files are only readable by their owner, as they may hold credentials.
+    Entries can be shared by processes.
+
+    Args:
+        directory (str or Path, optional): defaults to
+            $XDG_CACHE_HOME/supersetapiclient or ~/.cache/supersetapiclient
+        ttl (float, optional): time to live of entries, in seconds
+    """
+
+    def __init__(self, directory: Union[Path, str, None] = None, ttl: Optional[float] = None):
+        if directory is None:
+            cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+            directory = Path(cache_home) / "supersetapiclient"
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return default
+        if self.ttl is not None and time.time() - entry["stored_at"] > self.ttl:
+            return default
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        # Write to a temporary file first, so that readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": time.time(), "value": value}, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink()
+
+
+class ResponseCache:
+    """An LRU cache of HTTP responses, used by SupersetHTTPAdapter.
+
+    Successful GET responses are kept for ttl seconds, then revalidated with a
+    conditional request when the server sent an ETag or Last-Modified header
+    (a 304 response refreshes the entry), or fetched again otherwise. Requests
+    that modify a resource empty the cache, as they may change other resources.
+
+    A cache holds responses as seen by one user: don't share it between
+    clients logged in as different users.
+
+    Args:
+        maxsize (int): maximum number of cached responses
+        ttl (float): seconds during which responses are served without
+            contacting the server
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry["stored_at"] <= self.ttl
+
+    def set(self, url: str, entry: dict) -> None:
+        entry["stored_at"] = time.time()
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix: str) -> None:
+        """Evict responses of urls starting with prefix."""
+        with self._lock:
+            for url in [url for url in self._entries if url.startswith(prefix)]:
+                del self._entries[url]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def record(self, counter: str) -> None:
+        """Increment one of the hits, misses or revalidations counters."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "revalidations": self.revalidations, "size": len(self._entries)}
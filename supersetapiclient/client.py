@@ -1,6 +1,13 @@
 """A Superset REST Api Client."""
+import base64
 import getpass
+import itertools
+import json
 import logging
+import threading
+import time
+import uuid
+from typing import Iterator, Optional
 
 try:
     from functools import cached_property
@@ -10,22 +17,66 @@ except ImportError:  # pragma: no cover
 
 import requests.adapters
 import requests.exceptions
+import requests.structures
+import requests.utils
 import requests_oauthlib
+from urllib3.util import Retry
 
+from supersetapiclient import columnar
 from supersetapiclient.assets import Assets
-from supersetapiclient.base import raise_for_status
+from supersetapiclient.base import INFO_CACHE, IdentityMap, batched, prefetch, raise_for_status
+from supersetapiclient.cache import ResponseCache
 from supersetapiclient.charts import Charts
 from supersetapiclient.dashboards import Dashboards
 from supersetapiclient.databases import Databases
 from supersetapiclient.datasets import Datasets
 from supersetapiclient.exceptions import QueryLimitReached
+from supersetapiclient.jsonstream import iterparse
 from supersetapiclient.saved_queries import SavedQueries
+from supersetapiclient.sqllab import Query
 
 logger = logging.getLogger(__name__)
 
+# Transient errors of Superset and its reverse proxies
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Methods that don't require a CSRF token
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Size of the chunks of streamed query results
+SQL_CHUNK_SIZE = 64 * 1024
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Get the expiry timestamp of a JWT, or None if it can't be read.
+
+    The signature is not verified: this is only used to refresh the token
+    before the server rejects it.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def sql_literal(value) -> str:
+    """Format a value of a query result as a SQL literal."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'{}'".format(str(value).replace("'", "''"))
+
 
 class SupersetClient:
-    """A Superset Client."""
+    """A Superset Client.
+
+    A client can be shared between threads: login happens once, and when the
+    access token expires, a single thread refreshes it while the others wait
+    and replay their request with the new token.
+    """
 
     assets_cls = Assets
     dashboards_cls = Dashboards
@@ -42,43 +93,209 @@ class SupersetClient:
         password=None,
         provider="db",
         verify=True,
+        timeout=None,
+        retries=0,
+        backoff_factor=0.5,
+        pool_connections=10,
+        pool_maxsize=10,
+        token_refresh_leeway=30,
+        credentials_cache=None,
+        info_cache=INFO_CACHE,
+        superset_version=None,
+        response_cache=None,
+        identity_map=False,
     ):
+        """Create a new client.
+
+        Args:
+            host (str): url of the Superset instance
+            username (str, optional): defaults to the current user name
+            password (str, optional): prompted for when not given
+            provider (str): authentication provider
+            verify (bool): verify TLS certificates
+            timeout (float or tuple, optional): default (connect, read) timeout
+                of requests, in seconds. Can be overridden for each request.
+            retries (int or urllib3.util.Retry): number of retries of
+                idempotent requests (GET, PUT, DELETE...) on connection errors
+                and on 429, 502, 503 and 504 responses. Retry-After headers are
+                honoured, otherwise retries back off exponentially by
+                backoff_factor. A Retry object gives full control on the policy.
+            backoff_factor (float): see retries
+            pool_connections (int): number of connection pools to cache
+            pool_maxsize (int): maximum number of connections kept alive per pool
+            token_refresh_leeway (float): refresh the access token this many
+                seconds before it expires, rather than after a request is
+                rejected. Set to None to only refresh on rejection.
+            credentials_cache (optional): a cache (e.g. cache.FileCache) where
+                tokens, CSRF token and session cookies are kept between
+                clients, so that new clients skip login while the cached
+                tokens are valid. Any object with get(key) and set(key, value)
+                methods can be used.
+            info_cache (optional): a cache for the add and edit columns of
+                each object type. Defaults to an in-memory cache shared by the
+                clients of the process, with a 1 hour TTL. Use a
+                cache.FileCache to share it between processes, or None to
+                disable caching.
+            superset_version (str, optional): version of the Superset
+                instance, part of info_cache keys so that an upgrade does not
+                use stale entries.
+            response_cache (cache.ResponseCache, optional): cache GET
+                responses, revalidating them with conditional requests.
+            identity_map (bool): when True, objects loaded from the api are
+                reused while referenced: getting or finding an object that is
+                already loaded updates and returns the existing instance.
+        """
         self.host = host
         self.base_url = self.join_urls(host, "api/v1")
         self.username = username
         self._password = password
         self.provider = provider
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.token_refresh_leeway = token_refresh_leeway
+        self.credentials_cache = credentials_cache
+        self.info_cache = info_cache
+        self.superset_version = superset_version
+        self.response_cache = response_cache
+        self.identity_map = IdentityMap() if identity_map else None
         if not verify:
             self.http_adapter_cls = NoVerifyHTTPAdapter
+        self._session = None
+        # Guards authentication state shared between threads
+        self._lock = threading.RLock()
+
+    # Related Objects, created on first use
+    @cached_property
+    def assets(self):
+        return self.assets_cls(self)
+
+    @cached_property
+    def dashboards(self):
+        return self.dashboards_cls(self)
+
+    @cached_property
+    def charts(self):
+        return self.charts_cls(self)
 
-        # Related Objects
-        self.assets = self.assets_cls(self)
-        self.dashboards = self.dashboards_cls(self)
-        self.charts = self.charts_cls(self)
-        self.datasets = self.datasets_cls(self)
-        self.databases = self.databases_cls(self)
-        self.saved_queries = self.saved_queries_cls(self)
+    @cached_property
+    def datasets(self):
+        return self.datasets_cls(self)
+
+    @cached_property
+    def databases(self):
+        return self.databases_cls(self)
+
+    @cached_property
+    def saved_queries(self):
+        return self.saved_queries_cls(self)
 
     @cached_property
     def _token(self):
         return self.authenticate()
 
-    @cached_property
+    @property
     def session(self):
-        session = requests_oauthlib.OAuth2Session(token=self._token)
+        # Double-checked locking, so that threads share a single login
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        credentials = self._cached_credentials()
+        token = credentials["token"] if credentials else self._token
+        session = SupersetSession(token=token, before_request=self._before_request)
         session.hooks["response"] = [self.token_refresher]
-        if self.http_adapter_cls:
-            session.mount(self.host, adapter=self.http_adapter_cls())
-
-        # Update headers
-        session.headers.update(
-            {
-                "X-CSRFToken": f"{self.csrf_token(session)}",
-                "Referer": f"{self.base_url}",
-            }
-        )
+        session.mount(self.host, adapter=self.http_adapter())
+
+        # The CSRF token is only fetched once a request requires it
+        headers = {"Referer": f"{self.base_url}"}
+        if credentials:
+            session.cookies.update(credentials["cookies"])
+            if credentials.get("csrf_token"):
+                headers["X-CSRFToken"] = credentials["csrf_token"]
+        session.headers.update(headers)
+        self._store_credentials(session)
         return session
 
+    def _before_request(self, session, method: str) -> None:
+        self.refresh_expiring_token(session)
+        if method.upper() not in SAFE_METHODS:
+            self._ensure_csrf_token(session)
+
+    def _ensure_csrf_token(self, session) -> None:
+        if "X-CSRFToken" in session.headers:
+            return
+        with self._lock:
+            if "X-CSRFToken" in session.headers:
+                return
+            csrf_token = self.csrf_token(session)
+            # Replace rather than update headers, as other threads may be reading them
+            session.headers = requests.structures.CaseInsensitiveDict({**session.headers, "X-CSRFToken": f"{csrf_token}"})
+            self._store_credentials(session)
+
+    @property
+    def _credentials_key(self) -> str:
+        return f"credentials:{self.provider}:{self.username or getpass.getuser()}@{self.host}"
+
+    def _cached_credentials(self) -> Optional[dict]:
+        if self.credentials_cache is None:
+            return None
+        credentials = self.credentials_cache.get(self._credentials_key)
+        if not credentials:
+            return None
+        # Login again rather than trying to use an expired refresh token
+        expiry = jwt_expiry(credentials["token"].get("refresh_token", ""))
+        if expiry is not None and expiry - time.time() < (self.token_refresh_leeway or 0):
+            return None
+        return credentials
+
+    def _store_credentials(self, session) -> None:
+        if self.credentials_cache is None:
+            return
+        credentials = {
+            "token": session.token,
+            "csrf_token": session.headers.get("X-CSRFToken"),
+            "cookies": requests.utils.dict_from_cookiejar(session.cookies),
+        }
+        self.credentials_cache.set(self._credentials_key, credentials)
+
+    def http_adapter(self) -> requests.adapters.HTTPAdapter:
+        """Create the transport adapter mounted on the host.
+
+        Custom http_adapter_cls that don't derive from SupersetHTTPAdapter are
+        created without arguments, so timeouts, retries, pooling and the
+        response cache don't apply to them.
+        """
+        adapter_cls = self.http_adapter_cls or SupersetHTTPAdapter
+        if not issubclass(adapter_cls, SupersetHTTPAdapter):
+            return adapter_cls()
+        return adapter_cls(
+            timeout=self.timeout,
+            cache=self.response_cache,
+            max_retries=self.retry_policy(),
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+        )
+
+    def retry_policy(self) -> Retry:
+        if isinstance(self.retries, Retry):
+            return self.retries
+        return Retry(
+            total=self.retries,
+            # Without retries, raise read timeouts as they are, as requests does by default
+            read=None if self.retries else False,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            # Let raise_for_status propagate the last error message
+            raise_on_status=False,
+        )
+
     # Method shortcuts
     @property
     def get(self):
@@ -109,24 +326,22 @@ class SupersetClient:
         return "/".join(parts)
 
     def authenticate(self) -> dict:
-        # Try authentication and define session
+        # No need for session here because we are before authentication
+        response = requests.post(self.login_endpoint, json=self._login_payload())
+        raise_for_status(response)
+        return response.json()
+
+    def _login_payload(self) -> dict:
         if self.username is None:
             self.username = getpass.getuser()
         if self._password is None:
             self._password = getpass.getpass()
-
-        # No need for session here because we are before authentication
-        response = requests.post(
-            self.login_endpoint,
-            json={
-                "username": self.username,
-                "password": self._password,
-                "provider": self.provider,
-                "refresh": "true",
-            },
-        )
-        raise_for_status(response)
-        return response.json()
+        return {
+            "username": self.username,
+            "password": self._password,
+            "provider": self.provider,
+            "refresh": "true",
+        }
 
     def token_refresher(self, r, *args, **kwargs):
         """A requests response hook for token refresh."""
@@ -138,7 +353,47 @@ class SupersetClient:
                 return r
             if msg != "Token has expired":
                 return r
-            refresh_token = self.session.token["refresh_token"]
+            # Another thread may have refreshed the token since this request was sent
+            expired_access_token = r.request.headers.get("Authorization", "")[len("Bearer ") :]
+            access_token = self.refresh_access_token(expired_access_token)
+
+            # Set new authorization header
+            r.request.headers["Authorization"] = f"Bearer {access_token}"
+            # Streamed bodies must be sent again from the start
+            if hasattr(r.request.body, "seek"):
+                r.request.body.seek(0)
+
+            # Keep streamed downloads streamed
+            return self.session.send(r.request, stream=kwargs.get("stream", False), verify=False)
+        return r
+
+    def refresh_expiring_token(self, session) -> None:
+        """Refresh the access token of session if it is about to expire.
+
+        Tokens that are not JWTs are left alone, and refreshed by
+        token_refresher once rejected by the server.
+        """
+        if self.token_refresh_leeway is None:
+            return
+        access_token = session.token["access_token"]
+        expiry = jwt_expiry(access_token)
+        if expiry is not None and expiry - time.time() < self.token_refresh_leeway:
+            self.refresh_access_token(access_token, session=session)
+
+    def refresh_access_token(self, expired_access_token: Optional[str] = None, session=None) -> str:
+        """Get a new access token using the refresh token, and return it.
+
+        The refresh is skipped when the current access token is not
+        expired_access_token anymore, i.e. when another thread already
+        refreshed it: concurrent callers share a single refresh.
+        """
+        session = session or self.session
+        with self._lock:
+            token = session.token
+            if expired_access_token is not None and token["access_token"] != expired_access_token:
+                return token["access_token"]
+
+            refresh_token = token["refresh_token"]
             tmp_token = {"access_token": refresh_token}
 
             # Create a new session to avoid messing up the current session
@@ -148,16 +403,11 @@ class SupersetClient:
             new_token = refresh_r.json()
             if "refresh_token" not in new_token:
                 new_token["refresh_token"] = refresh_token
-            self.session.token = new_token
-
-            # Set new authorization header
-            bearer = f"Bearer {new_token['access_token']}"
-            r.request.headers["Authorization"] = bearer
+            session.token = new_token
+            self._store_credentials(session)
+            return new_token["access_token"]
 
-            return self.session.send(r.request, verify=False)
-        return r
-
-    def run(self, database_id, query, query_limit=None):
+    def run(self, database_id, query, query_limit=None, output=None):
         """Sends SQL queries to Superset and returns the resulting dataset.
 
         :param database_id: Database ID of DB to query
@@ -166,19 +416,75 @@ class SupersetClient:
         :type query: str
         :param query_limit: limit size of resultset, defaults to -1
         :type query_limit: int, optional
+        :param output: return the dataset by column, as "numpy" arrays (a dict
+            of arrays by column name), a "pandas" DataFrame or an "arrow"
+            Table. Requires the corresponding package.
+        :type output: str, optional
         :raises Exception: Query exception
-        :return: Resultset
-        :rtype: tuple(dict)
+        :return: Resultset: a (columns, rows) tuple of lists of dicts by
+            default, or with output a dict of numpy arrays by column name, a
+            pandas.DataFrame or a pyarrow.Table
+        :rtype: tuple(list, list), dict, pandas.DataFrame or pyarrow.Table
+        """
+        if output is not None:
+            columnar.require(output)
+            result = {}
+            buffer = columnar.ColumnBuffer()
+            for row in self._iter_sql_rows(database_id, query, result, query_limit=query_limit):
+                buffer.append(row)
+            self._check_query_limit(result)
+            return buffer.build(result.get("columns", []), output)
+
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        response = self.post(self._sql_endpoint, json=payload)
+        raise_for_status(response)
+        return self._sql_result(response.json())
+
+    def submit(self, database_id, query, query_limit=None) -> Query:
+        """Submits a SQL query to be run asynchronously by SQL Lab.
+
+        The query runs in a Superset worker, which requires the database to
+        allow running queries asynchronously (see Database.allow_run_async).
+        Otherwise Superset runs the query right away, and the returned query is
+        finished already.
+
+        :param database_id: Database ID of DB to query
+        :type database_id: int
+        :param query: Valid SQL Query
+        :type query: str
+        :param query_limit: limit size of resultset, defaults to -1
+        :type query_limit: int, optional
+        :return: The running query, to wait for, cancel or get results of
+        :rtype: Query
         """
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        payload.update(runAsync=True, client_id=self._query_client_id())
+        response = self.post(self._sql_endpoint, json=payload)
+        raise_for_status(response)
+        return Query.from_response(self, payload["client_id"], response.json())
+
+    @staticmethod
+    def _query_client_id() -> str:
+        # Superset limits client ids to 11 characters
+        return uuid.uuid4().hex[:11]
+
+    @staticmethod
+    def _sql_payload(database_id, query, query_limit=None) -> dict:
         payload = {
             "database_id": database_id,
             "sql": query,
         }
         if query_limit:
             payload["queryLimit"] = query_limit
-        response = self.post(self._sql_endpoint, json=payload)
-        raise_for_status(response)
-        result = response.json()
+        return payload
+
+    @classmethod
+    def _sql_result(cls, result: dict):
+        cls._check_query_limit(result)
+        return result["columns"], result["data"]
+
+    @staticmethod
+    def _check_query_limit(result: dict) -> None:
         display_limit = result.get("displayLimit", None)
         display_limit_reached = result.get("displayLimitReached", False)
         if display_limit_reached:
@@ -189,7 +495,117 @@ class SupersetClient:
                 f"keywords to your SQL statement to limit the number of rows "
                 f"returned."
             )
-        return result["columns"], result["data"]
+
+    def iter_run(
+        self,
+        database_id,
+        query,
+        query_limit=None,
+        batch_size=None,
+        chunk_size=None,
+        order_by=None,
+        keyset=False,
+        max_workers=1,
+    ) -> Iterator:
+        """Sends SQL queries to Superset and yields the rows of the resulting dataset.
+
+        Unlike run(), the response is parsed while it is downloaded: rows are
+        yielded as soon as they are received, and are not held in memory.
+
+        Results larger than the display limit of Superset can be fetched by
+        chunks of chunk_size rows, each one a query wrapping the original one
+        with LIMIT and OFFSET clauses. Up to max_workers chunks are fetched
+        concurrently. order_by is required, so that chunks don't overlap: it
+        must order the rows of the result in a unique way. With keyset, chunks
+        are rather selected by a WHERE clause on order_by, a column of the
+        result with unique values, which is faster on large tables but fetches
+        chunks one at a time.
+
+        :param database_id: Database ID of DB to query
+        :type database_id: int
+        :param query: Valid SQL Query
+        :type query: str
+        :param query_limit: limit size of resultset, defaults to -1
+        :type query_limit: int, optional
+        :param batch_size: yield lists of up to batch_size rows rather than rows
+        :type batch_size: int, optional
+        :param chunk_size: fetch the resultset by chunks of chunk_size rows
+        :type chunk_size: int, optional
+        :param order_by: SQL expression ordering the rows of chunks
+        :type order_by: str, optional
+        :param keyset: select chunks by the values of the order_by column
+        :type keyset: bool, optional
+        :param max_workers: number of chunks fetched concurrently
+        :type max_workers: int, optional
+        :raises QueryLimitReached: after the last row, when the resultset was truncated
+        :return: Rows, as dicts
+        """
+        if chunk_size:
+            rows = self._iter_chunked_rows(database_id, query, chunk_size, order_by, keyset, max_workers)
+            rows = itertools.islice(rows, query_limit) if query_limit else rows
+            yield from batched(rows, batch_size) if batch_size else rows
+            return
+
+        result = {}
+        rows = self._iter_sql_rows(database_id, query, result, query_limit=query_limit)
+        yield from batched(rows, batch_size) if batch_size else rows
+        self._check_query_limit(result)
+
+    def _iter_chunked_rows(self, database_id, query, chunk_size, order_by=None, keyset=False, max_workers=1) -> Iterator[dict]:
+        if not order_by:
+            # Rows of unordered queries may be returned in a different order by each chunk
+            raise ValueError("Chunked queries require order_by")
+        if keyset:
+            last_row = None
+            while True:
+                after = None if last_row is None else last_row[order_by]
+                _, rows = self.run(database_id, self._chunk_query(query, chunk_size, order_by=order_by, after=after))
+                yield from rows
+                if len(rows) < chunk_size:
+                    return
+                last_row = rows[-1]
+
+        def run_chunk(index):
+            chunk_query = self._chunk_query(query, chunk_size, order_by=order_by, offset=index * chunk_size)
+            return self.run(database_id, chunk_query)[1]
+
+        # Chunks after the last one are empty
+        for rows in prefetch(run_chunk, itertools.count(), max_workers=max_workers):
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+
+    @staticmethod
+    def _chunk_query(query: str, limit: int, order_by: Optional[str] = None, offset: int = 0, after=None) -> str:
+        """Wrap query to select limit of its rows, after offset rows or the order_by value after."""
+        # The query is on lines of its own, in case it ends with a comment
+        sql = f"SELECT * FROM (\n{query.strip().rstrip(';')}\n) AS _chunk"
+        if after is not None:
+            sql += f" WHERE {order_by} > {sql_literal(after)}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        sql += f" LIMIT {limit}"
+        if offset:
+            sql += f" OFFSET {offset}"
+        return sql
+
+    def _iter_sql_rows(self, database_id, query, result: dict, query_limit=None) -> Iterator[dict]:
+        payload = self._sql_payload(database_id, query, query_limit=query_limit)
+        with self.post(self._sql_endpoint, json=payload, stream=True) as response:
+            yield from self._iter_result_rows(response, result)
+
+    @staticmethod
+    def _iter_result_rows(response, result: dict) -> Iterator[dict]:
+        """Yield the rows of a streamed query result response.
+
+        The other members of the response, such as columns, are stored in result.
+        """
+        raise_for_status(response)
+        for key, value in iterparse(response.iter_content(chunk_size=SQL_CHUNK_SIZE), "data"):
+            if key == "data":
+                yield value
+            else:
+                result[key] = value
 
     @property
     def password(self) -> str:
@@ -207,17 +623,103 @@ class SupersetClient:
     def _sql_endpoint(self) -> str:
         return self.join_urls(self.host, "superset/sql_json/")
 
+    @property
+    def csrf_endpoint(self) -> str:
+        return self.join_urls(self.base_url, "security/csrf_token/")
+
     def csrf_token(self, session) -> str:
         # Get CSRF Token
         csrf_response = session.get(
-            self.join_urls(self.base_url, "security/csrf_token/"),
+            self.csrf_endpoint,
             headers={"Referer": f"{self.base_url}"},
         )
         raise_for_status(csrf_response)  # Check CSRF Token went well
         return csrf_response.json().get("result")
 
 
-class NoVerifyHTTPAdapter(requests.adapters.HTTPAdapter):
+class SupersetSession(requests_oauthlib.OAuth2Session):
+    """An OAuth2 session calling before_request(session, method) before each request"""
+
+    def __init__(self, *args, before_request=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.before_request = before_request
+
+    def request(self, method, *args, **kwargs):
+        if self.before_request is not None:
+            self.before_request(self, method)
+        return super().request(method, *args, **kwargs)
+
+
+class SupersetHTTPAdapter(requests.adapters.HTTPAdapter):
+    """An HTTP adapter with a default timeout and an optional response cache"""
+
+    __attrs__ = requests.adapters.HTTPAdapter.__attrs__ + ["timeout", "cache"]
+
+    def __init__(self, timeout=None, cache: Optional[ResponseCache] = None, **kwargs):
+        self.timeout = timeout
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        if self.cache is None or stream:
+            return super().send(request, stream=stream, timeout=timeout, **kwargs)
+        if request.method != "GET":
+            if request.method not in SAFE_METHODS:
+                # Changes may affect other resources, e.g. imports create charts and datasets
+                self.cache.clear()
+            return super().send(request, stream=stream, timeout=timeout, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry is not None:
+            # Requests with Cache-Control: no-cache are always revalidated
+            if self.cache.is_fresh(entry) and "no-cache" not in request.headers.get("Cache-Control", ""):
+                self.cache.record("hits")
+                return self._cached_response(request, entry)
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, stream=stream, timeout=timeout, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.record("revalidations")
+            for header, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+                if header in response.headers:
+                    entry["headers"][header] = entry[key] = response.headers[header]
+            self.cache.set(request.url, entry)
+            return self._cached_response(request, entry)
+
+        self.cache.record("misses")
+        if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+            self.cache.set(
+                request.url,
+                {
+                    "headers": dict(response.headers),
+                    "content": response.content,
+                    "encoding": response.encoding,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+            )
+        return response
+
+    def _cached_response(self, request, entry: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+        response._content = entry["content"]
+        response.encoding = entry["encoding"]
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+class NoVerifyHTTPAdapter(SupersetHTTPAdapter):
     """An HTTP adapter that ignores TLS validation errors"""
 
     def cert_verify(self, conn, url, verify, cert):
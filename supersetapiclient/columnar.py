@@ -0,0 +1,101 @@
+"""Columnar query results, as numpy arrays, pandas DataFrames or Arrow tables."""
+import importlib
+from typing import Any, Dict, List, Optional
+
+# Generic types of result columns (Superset's GenericDataType)
+NUMERIC = 0
+STRING = 1
+TEMPORAL = 2
+BOOLEAN = 3
+
+# Output formats, and the package each one requires
+OUTPUTS = {"arrow": "pyarrow", "pandas": "pandas", "numpy": "numpy"}
+
+
+def require(output: str):
+    """Import the package required by output, failing before any query is run."""
+    if output not in OUTPUTS:
+        raise ValueError(f"Unknown output {output!r}, expected one of {', '.join(OUTPUTS)}")
+    try:
+        return importlib.import_module(OUTPUTS[output])
+    except ImportError:
+        raise ImportError(f"output={output!r} requires {OUTPUTS[output]}: pip install superset-api-client[{output}]") from None
+
+
+def generic_type(column: dict) -> Optional[int]:
+    if column.get("type_generic") is not None:
+        return column["type_generic"]
+    if column.get("is_dttm"):
+        return TEMPORAL
+    return None
+
+
+class ColumnBuffer:
+    """Values of the rows of a query result, by column.
+
+    Rows are appended as they are parsed, so that only column lists are kept
+    in memory, then converted at once into the requested output.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, List[Any]] = {}
+
+    def append(self, row: dict) -> None:
+        values = self.values
+        for name, value in row.items():
+            column = values.get(name)
+            if column is None:
+                column = values[name] = []
+            column.append(value)
+
+    def build(self, columns: List[dict], output: str):
+        """Convert the values into output, using the types of the result columns."""
+        types = {c.get("column_name") or c.get("name"): generic_type(c) for c in columns}
+        # Keep the order of the columns of the result, even when there are no rows
+        names = list(types) + [name for name in self.values if name not in types]
+        values = {name: self.values.get(name, []) for name in names}
+        self.values = {}
+        return BUILDERS[output](values, types)
+
+
+def to_numpy(values: Dict[str, list], types: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    np = require("numpy")
+    arrays = {}
+    for name, column in values.items():
+        column_type = types.get(name)
+        if column_type == TEMPORAL:
+            arrays[name] = np.array(column, dtype="datetime64[ms]")
+        elif column_type == NUMERIC and None in column:
+            arrays[name] = np.array([np.nan if v is None else v for v in column], dtype=float)
+        elif column_type in (NUMERIC, BOOLEAN) and None not in column:
+            arrays[name] = np.array(column)
+        else:
+            arrays[name] = np.array(column, dtype=object)
+    return arrays
+
+
+def to_pandas(values: Dict[str, list], types: Dict[str, Optional[int]]):
+    pd = require("pandas")
+    df = pd.DataFrame(values, columns=list(values))
+    for name, column_type in types.items():
+        if column_type == TEMPORAL and name in df:
+            df[name] = pd.to_datetime(df[name], unit="ms" if pd.api.types.is_numeric_dtype(df[name]) else None)
+    return df
+
+
+def to_arrow(values: Dict[str, list], types: Dict[str, Optional[int]]):
+    pa = require("arrow")
+    arrays = []
+    for name, column in values.items():
+        array = pa.array(column)
+        if types.get(name) == TEMPORAL and (pa.types.is_integer(array.type) or pa.types.is_string(array.type)):
+            try:
+                array = array.cast(pa.timestamp("ms"))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # Keep values that can't be parsed as they are
+                pass
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=list(values))
+
+
+BUILDERS = {"arrow": to_arrow, "pandas": to_pandas, "numpy": to_numpy}
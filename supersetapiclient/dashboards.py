@@ -2,7 +2,8 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
-from supersetapiclient.base import Object, ObjectFactories, default_string, json_field
+from supersetapiclient.base import Object, ObjectFactories, default_string, json_field, raise_for_status
+from supersetapiclient.charts import Chart
 
 
 @dataclass
@@ -38,15 +39,29 @@ class Dashboard(Object):
         colors.update(value)
         self.colors = colors
 
-    def get_charts(self) -> List[int]:
+    def get_charts(self, max_workers: int = 1) -> List[Chart]:
         """Get chart objects"""
-        charts = []
-        for slice_name in self.charts:
-            c = self._parent.client.charts.find_one(slice_name=slice_name)
-            charts.append(c)
-        return charts
+        return self._parent.get_charts(self.id, max_workers=max_workers)
 
 
 class Dashboards(ObjectFactories):
     endpoint = "dashboard/"
     base_object = Dashboard
+
+    def charts_url(self, id: int) -> str:
+        return self.client.join_urls(self.base_url, id, "charts")
+
+    def chart_ids(self, id: int) -> List[int]:
+        """Get the ids of the charts in a dashboard."""
+        response = self.client.get(self.charts_url(id))
+        raise_for_status(response)
+        return [c["id"] for c in response.json().get("result", [])]
+
+    def get_charts(self, id: int, max_workers: int = 1) -> List[Chart]:
+        """Get the charts of a dashboard.
+
+        Chart ids are listed with a single request, then charts are loaded in
+        batches (see Charts.get_many), up to max_workers batches at a time.
+        """
+        charts = self.client.charts.get_many(self.chart_ids(id), max_workers=max_workers)
+        return list(charts.values())
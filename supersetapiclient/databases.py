@@ -47,6 +47,7 @@ class Database(Object):
 class Databases(ObjectFactories):
     endpoint = "database/"
     base_object = Database
+    bulk_delete = False
 
     @property
     def test_connection_url(self):
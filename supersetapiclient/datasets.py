@@ -26,6 +26,13 @@ class Dataset(Object):
             res.database_id = database.get("id")
         return res
 
+    def update_from_json(self, json: dict) -> None:
+        super().update_from_json(json)
+        database = json.get("database")
+        if database:
+            self.database_id = database.get("id")
+            self._mark_clean(["database_id"])
+
     def to_json(self, *args, **kwargs):
         o = super().to_json(*args, **kwargs)
         o.pop("columns", None)
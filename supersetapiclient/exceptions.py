@@ -16,6 +16,10 @@ class QueryLimitReached(Exception):
     pass
 
 
+class QueryFailed(Exception):
+    pass
+
+
 class BadRequestError(HTTPError):
     def __init__(self, *args, **kwargs):
         self.message = kwargs.pop("message", None)
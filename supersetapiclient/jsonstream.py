@@ -0,0 +1,176 @@
+"""Incremental parsing of JSON documents."""
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Tuple
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_INCOMPLETE = object()
+
+
+class ObjectParser:
+    """Parse a JSON object fed by chunks of bytes, returning its members as soon as they are complete.
+
+    Members are returned as (key, value) pairs, except for the array member
+    array_key: its elements are returned one by one as (array_key, element)
+    pairs, so that the array is never held in memory as a whole.
+
+        parser = ObjectParser("data")
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+        # Buffered length to wait for before decoding an incomplete value again
+        self._retry_length = 0
+
+    def feed(self, data: bytes) -> List[Tuple[str, Any]]:
+        """Parse data, and return the members completed by it."""
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(data)
+        self._pos = 0
+        if len(self._buffer) < self._retry_length:
+            return []
+        return self._parse(final=False)
+
+    def close(self) -> List[Tuple[str, Any]]:
+        """Parse the end of the document, and return the last members.
+
+        Raises:
+            ValueError: the document is invalid or truncated
+        """
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(b"", final=True)
+        self._pos = 0
+        members = self._parse(final=True)
+        if self._state != "end":
+            raise ValueError("Truncated JSON document")
+        return members
+
+    def _decode(self, final: bool) -> Any:
+        try:
+            value, end = _DECODER.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            value, end = _INCOMPLETE, len(self._buffer)
+        # A value at the end of the buffer may be truncated, e.g. a number
+        if end == len(self._buffer) and not final:
+            # Wait for the buffer to double, to avoid decoding large values over and over
+            self._retry_length = 2 * (len(self._buffer) - self._pos)
+            return _INCOMPLETE
+        self._pos = end
+        self._retry_length = 0
+        return value
+
+    def _expect(self, chars: str) -> str:
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise ValueError(f"Expecting one of {chars!r} at char {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _parse(self, final: bool) -> List[Tuple[str, Any]]:
+        members = []
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos == len(self._buffer):
+                return members
+            # Each state parses the next token, or returns False if it is incomplete
+            if not getattr(self, f"_parse_{self._state}")(final, members):
+                return members
+
+    def _parse_start(self, final: bool, members: list) -> bool:
+        self._expect("{")
+        self._state = "first_key"
+        return True
+
+    def _parse_first_key(self, final: bool, members: list) -> bool:
+        if self._buffer[self._pos] == "}":
+            self._pos += 1
+            self._state = "end"
+        else:
+            self._state = "key"
+        return True
+
+    def _parse_key(self, final: bool, members: list) -> bool:
+        key = self._decode(final)
+        if key is _INCOMPLETE:
+            return False
+        if not isinstance(key, str):
+            raise ValueError(f"Expecting a property name, got {key!r}")
+        self._key = key
+        self._state = "colon"
+        return True
+
+    def _parse_colon(self, final: bool, members: list) -> bool:
+        self._expect(":")
+        self._state = "value"
+        return True
+
+    def _parse_value(self, final: bool, members: list) -> bool:
+        if self._key == self.array_key and self._buffer[self._pos] == "[":
+            self._pos += 1
+            self._state = "first_item"
+            return True
+        value = self._decode(final)
+        if value is _INCOMPLETE:
+            return False
+        members.append((self._key, value))
+        self._state = "next"
+        return True
+
+    def _parse_first_item(self, final: bool, members: list) -> bool:
+        if self._buffer[self._pos] == "]":
+            self._pos += 1
+            self._state = "next"
+        else:
+            self._state = "item"
+        return True
+
+    def _parse_item(self, final: bool, members: list) -> bool:
+        value = self._decode(final)
+        if value is _INCOMPLETE:
+            return False
+        members.append((self._key, value))
+        self._state = "next_item"
+        return True
+
+    def _parse_next_item(self, final: bool, members: list) -> bool:
+        self._state = "item" if self._expect(",]") == "," else "next"
+        return True
+
+    def _parse_next(self, final: bool, members: list) -> bool:
+        self._state = "key" if self._expect(",}") == "," else "end"
+        return True
+
+    def _parse_end(self, final: bool, members: list) -> bool:
+        raise ValueError(f"Extra data at char {self._pos}")
+
+
+def iterparse(chunks: Iterable[bytes], array_key: str) -> Iterator[Tuple[str, Any]]:
+    """Parse a JSON object from chunks of bytes, yielding its members as they are complete.
+
+    See ObjectParser.
+    """
+    parser = ObjectParser(array_key)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiterparse(chunks: AsyncIterable[bytes], array_key: str) -> AsyncIterator[Tuple[str, Any]]:
+    """Parse a JSON object from an async iterable of bytes. See iterparse."""
+    parser = ObjectParser(array_key)
+    async for chunk in chunks:
+        for member in parser.feed(chunk):
+            yield member
+    for member in parser.close():
+        yield member
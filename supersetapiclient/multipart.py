@@ -0,0 +1,152 @@
+"""Streaming multipart/form-data encoding."""
+import bisect
+import contextlib
+import io
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+
+# Size of the chunks of streamed uploads
+CHUNK_SIZE = 64 * 1024
+
+Upload = Union[Path, str, bytes, BinaryIO]
+
+
+@contextlib.contextmanager
+def open_upload(upload: Upload, file_name: Optional[str] = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """Open a file to upload, given as a path, bytes or a binary file object.
+
+    Yields:
+        (str, file): the name of the file, and the file object
+    """
+    if isinstance(upload, (str, Path)):
+        with open(upload, "rb") as f:
+            yield file_name or os.path.basename(upload), f
+        return
+    if isinstance(upload, (bytes, bytearray, memoryview)):
+        yield file_name or "import.zip", io.BytesIO(upload)
+        return
+    name = getattr(upload, "name", None)
+    yield file_name or (os.path.basename(name) if isinstance(name, str) else "import.zip"), upload
+
+
+class MultipartEncoder:
+    """A multipart/form-data body, read from its fields while it is sent.
+
+    Files are not loaded in memory: the body is a read-only file object whose
+    length is known upfront, which requests sends by chunks, and an async
+    iterable for httpx.
+
+        body = MultipartEncoder([("name", "value"), ("file", ("file.zip", f, "application/zip"))])
+        client.post(url, data=body, headers={"Content-Type": body.content_type})
+
+    Args:
+        fields (list): (name, value) pairs, where value is a string or a
+            (file name, binary file object or bytes, content type) tuple.
+            Files are read from their current position.
+        progress (callable, optional): called with the number of bytes read
+            and the total length of the body after each read
+    """
+
+    def __init__(
+        self,
+        fields: List[Tuple[str, Union[str, tuple]]],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.progress = progress
+        # Parts of the body: bytes, or (file object, start position, length)
+        self._parts = []
+        self._offsets = []
+        self._length = 0
+        self._position = 0
+        for name, value in fields:
+            if isinstance(value, tuple):
+                file_name, f, content_type = value
+                self._add(self._header(name, file_name, content_type))
+                self._add_file(f)
+                self._add(b"\r\n")
+            else:
+                self._add(self._header(name) + value.encode("utf-8") + b"\r\n")
+        self._add(f"--{self.boundary}--\r\n".encode())
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+    def _header(self, name: str, file_name: Optional[str] = None, content_type: Optional[str] = None) -> bytes:
+        disposition = f'form-data; name="{self._quote(name)}"'
+        if file_name is not None:
+            disposition += f'; filename="{self._quote(file_name)}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type is not None:
+            header += f"Content-Type: {content_type}\r\n"
+        return f"{header}\r\n".encode("utf-8")
+
+    def _add(self, data: bytes, length: Optional[int] = None) -> None:
+        self._parts.append(data)
+        self._offsets.append(self._length)
+        self._length += len(data) if length is None else length
+
+    def _add_file(self, f: Union[bytes, BinaryIO]) -> None:
+        if isinstance(f, (bytes, bytearray, memoryview)):
+            self._add(bytes(f))
+            return
+        if not (hasattr(f, "seekable") and f.seekable()):
+            # The length of the body must be known before sending it
+            f = io.BytesIO(f.read())
+        start = f.tell()
+        length = f.seek(0, io.SEEK_END) - start
+        f.seek(start)
+        self._add((f, start), length=length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._position = min(max(offset, 0), self._length)
+        return self._position
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length - self._position
+        chunks = []
+        while size > 0 and self._position < self._length:
+            index = bisect.bisect_right(self._offsets, self._position) - 1
+            part, offset = self._parts[index], self._offsets[index]
+            end = self._offsets[index + 1] if index + 1 < len(self._parts) else self._length
+            n = min(size, end - self._position)
+            if isinstance(part, bytes):
+                data = part[self._position - offset : self._position - offset + n]
+            else:
+                f, start = part
+                f.seek(start + self._position - offset)
+                data = f.read(n)
+                if not data:
+                    raise IOError("File was truncated while being uploaded")
+            chunks.append(data)
+            self._position += len(data)
+            size -= len(data)
+        if chunks and self.progress is not None:
+            self.progress(self._position, self._length)
+        return b"".join(chunks)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self.seek(0)
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
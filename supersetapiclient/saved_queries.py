@@ -24,6 +24,13 @@ class SavedQuery(Object):
             res.db_id = database.get("id")
         return res
 
+    def update_from_json(self, json: dict) -> None:
+        super().update_from_json(json)
+        database = json.get("database")
+        if database:
+            self.db_id = database.get("id")
+            self._mark_clean(["db_id"])
+
     def run(self, query_limit=None):
         return self._parent.client.run(database_id=self.db_id, query=self.sql, query_limit=query_limit)
 
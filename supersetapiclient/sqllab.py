@@ -0,0 +1,186 @@
+"""Queries run asynchronously by SQL Lab."""
+import json
+import time
+from typing import Iterator, Optional
+
+from supersetapiclient.base import batched, raise_for_status
+from supersetapiclient.exceptions import QueryFailed
+
+SUCCESS = "success"
+# States of queries that are no longer running
+FINISHED_STATES = (SUCCESS, "failed", "stopped", "timed_out")
+
+# Polled resources must not be served from a response cache
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+class Query:
+    """A query run asynchronously by SQL Lab, see SupersetClient.submit.
+
+    Superset runs the query in a worker and keeps its result in its results
+    backend, so that no HTTP connection is held open while the query runs.
+
+        query = client.submit(database_id=1, query="SELECT * FROM logs")
+        query.wait(timeout=600)
+        columns, data = query.result()
+
+    Attributes:
+        id (int): query id
+        client_id (str): query id chosen by the client, used to stop the query
+        status (str): pending, running, success, failed, stopped or timed_out
+        results_key (str): key of the result in the results backend
+        error_message (str): error message of failed queries
+    """
+
+    def __init__(
+        self,
+        client,
+        id: int,
+        client_id: str,
+        status: str,
+        results_key: Optional[str] = None,
+        error_message: Optional[str] = None,
+        result: Optional[dict] = None,
+    ):
+        self.client = client
+        self.id = id
+        self.client_id = client_id
+        self.status = status
+        self.results_key = results_key
+        self.error_message = error_message
+        # Result sent on submission, when the database doesn't run queries asynchronously
+        self._result = result
+
+    @classmethod
+    def from_response(cls, client, client_id: str, response: dict) -> "Query":
+        """Create a query from the response to its submission."""
+        if "data" in response:
+            return cls(client, id=response.get("query_id"), client_id=client_id, status=SUCCESS, result=response)
+        query = response["query"]
+        return cls(
+            client,
+            id=query["queryId"],
+            client_id=client_id,
+            status=query.get("state"),
+            results_key=query.get("resultsKey"),
+            error_message=query.get("errorMessage"),
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r}, status={self.status!r})"
+
+    @property
+    def url(self) -> str:
+        return self.client.join_urls(self.client.base_url, "query", self.id)
+
+    @property
+    def stop_url(self) -> str:
+        return self.client.join_urls(self.client.base_url, "query/stop")
+
+    @property
+    def results_url(self) -> str:
+        return self.client.join_urls(self.client.base_url, "sqllab/results/")
+
+    @property
+    def done(self) -> bool:
+        """Whether the query is no longer running."""
+        return self.status in FINISHED_STATES
+
+    def _update(self, result: dict) -> None:
+        self.status = result.get("status")
+        self.results_key = result.get("results_key")
+        self.error_message = result.get("error_message")
+
+    def refresh(self) -> str:
+        """Fetch the status of the query, and return it."""
+        if not self.done:
+            response = self.client.get(self.url, headers=NO_CACHE)
+            raise_for_status(response)
+            self._update(response.json()["result"])
+        return self.status
+
+    @staticmethod
+    def _poll_delays(timeout: Optional[float], poll_interval: float, max_poll_interval: float) -> Iterator[float]:
+        """Get delays between polls, growing up to max_poll_interval, until timeout seconds from now."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def delays():
+            interval = poll_interval
+            while True:
+                delay = interval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"Query did not finish within {timeout} seconds")
+                    delay = min(delay, remaining)
+                yield delay
+                interval = min(interval * 1.5, max_poll_interval)
+
+        return delays()
+
+    def wait(self, timeout: Optional[float] = None, poll_interval: float = 0.5, max_poll_interval: float = 10) -> str:
+        """Wait for the query to finish, and return its final status.
+
+        The status is polled every poll_interval seconds at first, then less
+        and less often, up to every max_poll_interval seconds.
+
+        Raises:
+            TimeoutError: the query did not finish within timeout seconds
+        """
+        delays = self._poll_delays(timeout, poll_interval, max_poll_interval)
+        while self.refresh() not in FINISHED_STATES:
+            time.sleep(next(delays))
+        return self.status
+
+    def cancel(self) -> str:
+        """Stop the query, unless it already finished, and return its status."""
+        if not self.done:
+            response = self.client.post(self.stop_url, json={"client_id": self.client_id})
+            raise_for_status(response)
+            # The query may have finished before it could be stopped
+            self.refresh()
+        return self.status
+
+    def _check_success(self) -> None:
+        if self.status != SUCCESS:
+            raise QueryFailed(self.error_message or f"Query {self.id} {self.status}")
+
+    def _results_params(self) -> dict:
+        return {"q": json.dumps({"key": self.results_key})}
+
+    def result(self, timeout: Optional[float] = None):
+        """Wait for the query to finish, and return the resulting dataset.
+
+        See SupersetClient.run.
+
+        :raises QueryFailed: the query failed or was stopped
+        """
+        self.wait(timeout)
+        self._check_success()
+        if self._result is not None:
+            return self.client._sql_result(self._result)
+        response = self.client.get(self.results_url, params=self._results_params())
+        raise_for_status(response)
+        return self.client._sql_result(response.json())
+
+    def iter_rows(self, batch_size: Optional[int] = None, timeout: Optional[float] = None) -> Iterator:
+        """Wait for the query to finish, and yield the rows of the resulting dataset.
+
+        Rows are yielded while the result is downloaded, see SupersetClient.iter_run.
+
+        :raises QueryFailed: the query failed or was stopped
+        """
+        self.wait(timeout)
+        self._check_success()
+        result = {}
+        rows = self._iter_rows(result)
+        yield from batched(rows, batch_size) if batch_size else rows
+        self.client._check_query_limit(result)
+
+    def _iter_rows(self, result: dict) -> Iterator[dict]:
+        if self._result is not None:
+            result.update(self._result)
+            yield from self._result["data"]
+            return
+        with self.client.get(self.results_url, params=self._results_params(), stream=True) as response:
+            yield from self.client._iter_result_rows(response, result)
@@ -0,0 +1,288 @@
+import asyncio
+import io
+import json
+import re
+
+import pytest
+
+from supersetapiclient.async_client import AsyncSupersetClient
+from supersetapiclient.datasets import Dataset
+from supersetapiclient.exceptions import QueryFailed, QueryLimitReached
+from tests.base.test_run import COLUMNS, sql_json
+from tests.conftest import API_MOCKS, SUPERSET_BASE_URI
+
+httpx = pytest.importorskip("httpx")
+
+
+class MockServer:
+    """Handler of an httpx.MockTransport, answering requests by method and path."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        for endpoint in API_MOCKS.glob("*/*"):
+            name, method = endpoint.name.split(".")
+            self.route(method, f"/api/v1/{endpoint.parent.name}/{name}", json=json.loads(endpoint.read_text()))
+
+    def route(self, method, path, *handlers, status_code=200, **response):
+        """Answer requests with handlers in turn, the last one repeatedly, or with an httpx.Response of response."""
+        if not handlers:
+            handlers = [lambda request: httpx.Response(status_code, **response)]
+        self.routes[method.upper(), path.rstrip("/")] = list(handlers)
+
+    def sent(self, method, path):
+        return [r for r in self.requests if r.method == method and r.url.path.rstrip("/") == path.rstrip("/")]
+
+    def __call__(self, request):
+        self.requests.append(request)
+        handlers = self.routes.get((request.method, request.url.path.rstrip("/")))
+        if handlers is None:
+            return httpx.Response(404, json={"message": "Not found"})
+        handler = handlers.pop(0) if len(handlers) > 1 else handlers[0]
+        return handler(request)
+
+
+@pytest.fixture
+def server():
+    return MockServer()
+
+
+def run(server, test):
+    """Run the coroutine function test with a client of server."""
+
+    async def main():
+        async with AsyncSupersetClient(SUPERSET_BASE_URI, "test", "test") as client:
+            client.info_cache = None
+            client.session = httpx.AsyncClient(transport=httpx.MockTransport(server))
+            return await test(client)
+
+    return asyncio.run(main())
+
+
+def test_save_many(server):
+    "Test that failed saves don't abort a batch"
+
+    server.route("GET", "/api/v1/chart/_info", json={"edit_columns": [{"name": "slice_name"}]})
+    server.route("PUT", "/api/v1/chart/1", json={"id": 1})
+    server.route("PUT", "/api/v1/chart/2", status_code=422, json={"message": "Invalid"})
+
+    async def test(client):
+        charts = [client.charts._object_from_json({"id": i, "slice_name": "chart"}) for i in (1, 2)]
+        for chart in charts:
+            chart.slice_name = f"chart {chart.id}"
+        result = await client.charts.save_many(charts, max_workers=2)
+        assert result.results == [charts[0], None]
+        assert result.errors[1].message == "Invalid"
+        assert charts[0].changed_fields() == []
+        assert charts[1].changed_fields() == ["slice_name"]
+
+    run(server, test)
+    assert json.loads(server.sent("PUT", "/api/v1/chart/1")[0].content) == {"slice_name": "chart 1"}
+
+
+def test_add_many(server):
+    "Test that created objects get their id"
+
+    server.route("GET", "/api/v1/dataset/_info", json={"add_columns": [{"name": "table_name"}]})
+    server.route(
+        "POST",
+        "/api/v1/dataset/",
+        lambda request: httpx.Response(201, json={"id": 10}),
+        lambda request: httpx.Response(422, json={"message": "Invalid"}),
+    )
+    datasets = [Dataset(table_name="table"), Dataset(table_name="other")]
+
+    async def test(client):
+        return await client.datasets.add_many(datasets, max_workers=1)
+
+    result = run(server, test)
+    assert result.results == [datasets[0], None]
+    assert datasets[0].id == 10
+    assert datasets[1].id is None
+    assert result.errors[1].message == "Invalid"
+
+
+def test_delete_many(server):
+    "Test bulk deletion, its fallback to one request per object, and failed chunks"
+
+    def bulk_delete(request):
+        ids = request.url.params["q"]
+        if ids == "[5,6]":
+            raise httpx.ConnectError("Connection refused", request=request)
+        if ids == "[3,4]":
+            return httpx.Response(404, json={"message": "Not found"})
+        return httpx.Response(200, json={"message": "Deleted 2 charts"})
+
+    server.route("DELETE", "/api/v1/chart/", bulk_delete)
+    server.route("DELETE", "/api/v1/chart/3", json={"message": "OK"})
+    server.route("DELETE", "/api/v1/chart/4", status_code=404, json={"message": "Not found"})
+
+    async def test(client):
+        return await client.charts.delete_many([1, 2, 3, 4, 5, 6], chunk_size=2, max_workers=2)
+
+    result = run(server, test)
+    assert result.results == [True, True, True, None, None, None]
+    assert list(result.errors) == [3, 4, 5]
+    assert result.errors[3].response.status_code == 404
+    assert isinstance(result.errors[4], httpx.ConnectError)
+
+
+def test_export_import(server):
+    "Test that exports are streamed to file objects, and imports sent again after a token refresh"
+
+    content = b"PK" + bytes(3 * 1024 * 1024)
+    server.route("GET", "/api/v1/dashboard/export/", content=content, headers={"content-type": "application/zip"})
+    server.route("POST", "/api/v1/security/refresh", json={"access_token": "new_access_token"})
+    server.route(
+        "POST",
+        "/api/v1/dashboard/import/",
+        lambda request: httpx.Response(401, json={"msg": "Token has expired"}),
+        lambda request: httpx.Response(200, json={"message": "OK"}),
+    )
+    progress = []
+    f = io.BytesIO()
+
+    async def test(client):
+        await client.dashboards.export([1, 2], f, progress=lambda written, total: progress.append(written))
+        return await client.dashboards.import_file(f.getvalue(), overwrite=True, file_name="dashboards.zip")
+
+    assert run(server, test)
+    assert f.getvalue() == content
+    assert progress[-1] == len(content)
+    assert server.sent("GET", "/api/v1/dashboard/export/")[0].url.params["q"] == "[1,2]"
+
+    first, second = server.sent("POST", "/api/v1/dashboard/import/")
+    assert second.headers["Authorization"] == "Bearer new_access_token"
+    assert second.content == first.content
+    assert content in second.content
+    assert b'name="overwrite"\r\n\r\ntrue' in second.content
+
+
+def test_iter_run(server):
+    "Test that query results are streamed, and fetched by chunks"
+
+    rows = [{"id": i, "name": f"row {i}"} for i in range(25)]
+
+    def chunk(request):
+        match = re.search(r"LIMIT (\d+)(?: OFFSET (\d+))?$", json.loads(request.content)["sql"])
+        start = int(match.group(2) or 0)
+        return httpx.Response(200, content=sql_json(rows[start : start + int(match.group(1))]))
+
+    async def test(client):
+        server.route("POST", "/superset/sql_json/", content=sql_json(rows[:5], limit_reached=True))
+        batches = []
+        with pytest.raises(QueryLimitReached):
+            async for batch in client.iter_run(1, "SELECT * FROM t", batch_size=2):
+                batches.append(batch)
+        assert batches == [rows[:2], rows[2:4], rows[4:5]]
+
+        server.route("POST", "/superset/sql_json/", chunk)
+        chunked = client.iter_run(1, "SELECT * FROM t", chunk_size=10, order_by="id", max_workers=2)
+        assert [row async for row in chunked] == rows
+        chunked = client.iter_run(1, "SELECT * FROM t", query_limit=12, chunk_size=10, order_by="id")
+        assert [row async for row in chunked] == rows[:12]
+
+    run(server, test)
+
+
+def test_submit(server):
+    "Test that asynchronous queries are polled until they finish"
+
+    rows = [{"id": 1, "name": "row 1"}]
+    server.route("POST", "/superset/sql_json/", status_code=202, json={"query": {"queryId": 5, "state": "pending"}})
+    server.route(
+        "GET",
+        "/api/v1/query/5",
+        lambda request: httpx.Response(200, json={"result": {"status": "running"}}),
+        lambda request: httpx.Response(200, json={"result": {"status": "success", "results_key": "key"}}),
+    )
+    server.route("GET", "/api/v1/sqllab/results/", content=sql_json(rows))
+
+    async def test(client):
+        query = await client.submit(1, "SELECT * FROM t")
+        assert await query.wait(poll_interval=0.01) == "success"
+        assert await query.result() == (COLUMNS, rows)
+        assert [row async for row in query.iter_rows()] == rows
+        # Finished queries are not stopped
+        assert await query.cancel() == "success"
+
+    run(server, test)
+    assert json.loads(server.sent("POST", "/superset/sql_json/")[0].content)["runAsync"] is True
+    assert len(server.sent("GET", "/api/v1/query/5")) == 2
+    assert not server.sent("POST", "/api/v1/query/stop")
+
+
+def test_submit_cancel(server):
+    server.route("POST", "/superset/sql_json/", status_code=202, json={"query": {"queryId": 5, "state": "running"}})
+    server.route("GET", "/api/v1/query/5", json={"result": {"status": "running"}})
+    server.route("POST", "/api/v1/query/stop", json={"result": "OK"})
+
+    async def test(client):
+        query = await client.submit(1, "SELECT * FROM t")
+        with pytest.raises(TimeoutError):
+            await query.wait(timeout=0.05, poll_interval=0.01)
+        server.route("GET", "/api/v1/query/5", json={"result": {"status": "stopped"}})
+        assert await query.cancel() == "stopped"
+        with pytest.raises(QueryFailed):
+            await query.result()
+        return query
+
+    query = run(server, test)
+    assert json.loads(server.sent("POST", "/api/v1/query/stop")[0].content) == {"client_id": query.client_id}
+
+
+def test_run_output(server):
+    "Test that results can be returned by column"
+
+    pd = pytest.importorskip("pandas")
+    rows = [{"id": 1, "name": "a"}, {"id": 2, "name": None}]
+    server.route("POST", "/superset/sql_json/", content=sql_json(rows))
+
+    async def test(client):
+        return await client.run(1, "SELECT * FROM t", output="pandas")
+
+    df = run(server, test)
+    assert isinstance(df, pd.DataFrame)
+    assert list(df.columns) == ["id", "name"]
+    assert df["id"].tolist() == [1, 2]
+
+
+def test_iter_find_page_size_cap(server):
+    "Test that all objects are listed when the server caps the page size"
+
+    def listing(request):
+        query = json.loads(request.url.params["q"])
+        page_size = min(query["page_size"], 100)
+        ids = range(query["page"] * page_size, min((query["page"] + 1) * page_size, 450))
+        return httpx.Response(200, json={"count": 450, "result": [{"id": i, "slice_name": "chart"} for i in ids]})
+
+    server.route("GET", "/api/v1/chart/", listing)
+
+    async def test(client):
+        return [chart.id async for chart in client.charts.iter_find(page_size=500, max_workers=2)]
+
+    assert run(server, test) == list(range(450))
+
+
+def test_iter_find_early_stop(server):
+    "Test that pages fetched ahead are cancelled when iteration stops"
+
+    async def listing_page(request):
+        query = json.loads(request.url.params["q"])
+        if query["page"] == 2:
+            await asyncio.sleep(10)
+        ids = range(query["page"] * 100, (query["page"] + 1) * 100)
+        return httpx.Response(200, json={"count": 300, "result": [{"id": i, "slice_name": "chart"} for i in ids]})
+
+    server.route("GET", "/api/v1/chart/", listing_page)
+
+    async def test(client):
+        charts = client.charts.iter_find(max_workers=2)
+        for i in range(101):
+            assert (await charts.__anext__()).id == i
+        await charts.aclose()
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.sleep(0)
+        return [task for task in pending if not task.done()]
+
+    assert run(server, test) == []
@@ -0,0 +1,123 @@
+import pytest
+import requests
+import requests.adapters
+import requests.structures
+
+from supersetapiclient.cache import FileCache, MemoryCache, ResponseCache
+from supersetapiclient.client import SupersetClient, SupersetHTTPAdapter
+from tests.conftest import SUPERSET_API_URI, SUPERSET_BASE_URI
+
+
+def test_memory_cache():
+    "Test in-memory cache expiry"
+
+    cache = MemoryCache(ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    cache.ttl = -1
+    assert cache.get("key") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_info_cache(permanent_requests, requests_mock, tmp_path):
+    "Test that object metadata is shared by clients"
+
+    info = requests_mock.get(
+        f"{SUPERSET_API_URI}/dashboard/_info",
+        json={"add_columns": [{"name": "dashboard_title"}], "edit_columns": [{"name": "slug"}]},
+    )
+    cache = FileCache(tmp_path, ttl=60)
+    for _ in range(3):
+        client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=cache)
+        assert client.dashboards.add_columns == ["dashboard_title"]
+        assert client.dashboards.edit_columns == ["slug"]
+    assert info.call_count == 1
+
+    # Another Superset version has its own entries
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=cache, superset_version="3.0.0")
+    assert client.dashboards.add_columns == ["dashboard_title"]
+    assert info.call_count == 2
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=None)
+    assert client.dashboards.add_columns == ["dashboard_title"]
+    assert info.call_count == 3
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    "Requests sent by HTTP adapters, answered with the queued (status, headers, content) responses"
+
+    sent = []
+    responses = []
+
+    def send(adapter, request, **kwargs):
+        sent.append(request)
+        status_code, headers, content = responses.pop(0) if responses else (200, {}, b"{}")
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.url = request.url
+        response.request = request
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    monkeypatch.setattr(requests.adapters.HTTPAdapter, "send", send)
+    return sent, responses
+
+
+def cached_session(cache):
+    session = requests.Session()
+    session.mount(SUPERSET_BASE_URI, SupersetHTTPAdapter(cache=cache))
+    return session
+
+
+def test_response_cache_revalidation(transport):
+    "Test that stale responses are revalidated, and replayed on 304"
+
+    sent, responses = transport
+    cache = ResponseCache(ttl=60)
+    session = cached_session(cache)
+    url = f"{SUPERSET_API_URI}/chart/1"
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 02 Jan 2023 10:00:00 GMT"}
+    responses.append((200, headers, b'{"result": {"id": 1}}'))
+
+    assert session.get(url).json() == {"result": {"id": 1}}
+    assert session.get(url).json() == {"result": {"id": 1}}
+    assert len(sent) == 1
+    assert cache.stats["hits"] == 1
+
+    cache.ttl = -1
+    responses.append((304, {"ETag": '"v2"'}, b""))
+    response = session.get(url)
+    assert response.status_code == 200
+    assert response.json() == {"result": {"id": 1}}
+    assert sent[-1].headers["If-None-Match"] == '"v1"'
+    assert sent[-1].headers["If-Modified-Since"] == headers["Last-Modified"]
+    assert cache.stats["revalidations"] == 1
+
+    # The new validator is sent next time
+    responses.append((200, {"ETag": '"v3"'}, b'{"result": {"id": 1, "slice_name": "new"}}'))
+    assert session.get(url).json()["result"]["slice_name"] == "new"
+    assert sent[-1].headers["If-None-Match"] == '"v2"'
+
+
+@pytest.mark.parametrize("method", ["POST", "PUT", "DELETE"])
+def test_response_cache_writes(transport, method):
+    "Test that requests modifying resources empty the response cache"
+
+    sent, _ = transport
+    session = cached_session(ResponseCache(ttl=60))
+    session.get(f"{SUPERSET_API_URI}/chart/")
+    session.get(f"{SUPERSET_API_URI}/chart/")
+    assert [r.method for r in sent] == ["GET"]
+
+    # Writes may affect other resources, e.g. imports create charts
+    session.request(method, f"{SUPERSET_API_URI}/assets/import/")
+    session.get(f"{SUPERSET_API_URI}/chart/")
+    assert [r.method for r in sent] == ["GET", method, "GET"]
+
+    # Safe requests don't
+    session.head(f"{SUPERSET_API_URI}/dataset/")
+    session.get(f"{SUPERSET_API_URI}/chart/")
+    assert len(sent) == 4
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from supersetapiclient.jsonstream import iterparse
+
+
+def test_iterparse():
+    "Test that array elements are parsed as soon as they are received"
+
+    document = {
+        "status": "success",
+        "data": [{"id": i, "name": f"é {i}", "value": i * 1.5} for i in range(100)],
+        "columns": [{"name": "id"}],
+        "empty": [],
+        "count": 12345,
+    }
+    content = json.dumps(document, indent=2, ensure_ascii=False).encode()
+    for size in (1, 7, 4096, len(content)):
+        chunks = [content[i : i + size] for i in range(0, len(content), size)]
+        members = list(iterparse(chunks, "data"))
+        assert [value for key, value in members if key == "data"] == document["data"]
+        assert {key: value for key, value in members if key != "data"} == {k: v for k, v in document.items() if k != "data"}
+
+    parser = iterparse([content[:300]], "data")
+    assert next(parser) == ("status", "success")
+    assert next(parser) == ("data", document["data"][0])
+
+
+@pytest.mark.parametrize("content", [b'{"data": [1, 2', b'{"data": [1,]}', b"[1]", b'{"data": 1} 2'])
+def test_iterparse_invalid(content):
+    with pytest.raises(ValueError):
+        list(iterparse([content], "data"))
@@ -0,0 +1,33 @@
+import email
+import io
+from email import policy
+
+from supersetapiclient.multipart import MultipartEncoder
+
+
+def parse(body: MultipartEncoder) -> dict:
+    message = email.message_from_bytes(f"Content-Type: {body.content_type}\r\n\r\n".encode() + body.read(), policy=policy.HTTP)
+    return {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+
+
+def test_multipart_encoder():
+    "Test that multipart bodies are read by chunks from files"
+
+    content = bytes(range(256)) * 1000
+    f = io.BytesIO(content)
+    progress = []
+    body = MultipartEncoder(
+        [("overwrite", "true"), ("formData", ("bundle.zip", f, "application/zip"))],
+        progress=lambda read, total: progress.append((read, total)),
+    )
+
+    chunks = iter(lambda: body.read(10000), b"")
+    assert len(b"".join(chunks)) == len(body)
+    assert progress[-1] == (len(body), len(body))
+
+    body.seek(0)
+    parts = parse(body)
+    assert parts["overwrite"].get_content() == "true"
+    assert parts["formData"].get_filename() == "bundle.zip"
+    assert parts["formData"].get_content_type() == "application/zip"
+    assert parts["formData"].get_payload(decode=True) == content
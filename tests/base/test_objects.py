@@ -0,0 +1,252 @@
+import dataclasses
+import gc
+import io
+import json
+
+import requests
+
+from supersetapiclient.client import SupersetClient
+from supersetapiclient.dashboards import Dashboard
+from supersetapiclient.datasets import Dataset
+from tests.conftest import SUPERSET_API_URI, SUPERSET_BASE_URI
+
+
+def test_identity_map(permanent_requests, requests_mock):
+    "Test that loading an object twice returns the same instance"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", identity_map=True)
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dataset/1",
+        json={"result": {"table_name": "table", "database": {"id": 2}}},
+    )
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dataset/",
+        json={"count": 1, "result": [{"id": 1, "table_name": "renamed"}]},
+    )
+
+    dataset = client.datasets.get(1)
+    assert dataset.database_id == 2
+    assert client.datasets.get(1) is dataset
+
+    # Listed objects are merged into the known instance
+    assert client.datasets.find() == [dataset]
+    assert dataset.table_name == "renamed"
+    assert dataset.database_id == 2
+
+    # Unreferenced objects are dropped
+    del dataset
+    gc.collect()
+    assert len(client.identity_map) == 0
+
+
+def test_no_identity_map(permanent_requests, requests_mock):
+    "Test that objects are not reused by default"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.get(f"{SUPERSET_API_URI}/dataset/1", json={"result": {"table_name": "table"}})
+    assert client.datasets.get(1) is not client.datasets.get(1)
+
+
+def capped_listing(ids, max_page_size=100):
+    "Mock a listing endpoint serving pages of up to max_page_size objects, as Superset does"
+
+    def listing(request, context):
+        query = json.loads(request.qs["q"][0])
+        matching = ids
+        for f in query.get("filters", []):
+            if f["opr"] == "in":
+                matching = [i for i in matching if i in f["value"]]
+        page_size = min(query["page_size"], max_page_size)
+        page = matching[query["page"] * page_size : (query["page"] + 1) * page_size]
+        return {"count": len(matching), "result": [{"id": i, "slice_name": f"chart {i}"} for i in page]}
+
+    return listing
+
+
+def test_iter_find_page_size_cap(permanent_requests, requests_mock):
+    "Test that all objects are listed when the server caps the page size"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    listing = requests_mock.get(f"{SUPERSET_API_URI}/chart/", json=capped_listing(list(range(450))))
+
+    charts = list(client.charts.iter_find(page_size=500, max_workers=2))
+    assert [chart.id for chart in charts] == list(range(450))
+    assert listing.call_count == 5
+
+
+def test_get_many_page_size_cap(permanent_requests, requests_mock):
+    "Test that chunks larger than the pages served by the server are fully loaded"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.get(f"{SUPERSET_API_URI}/chart/", json=capped_listing(list(range(1, 301))))
+
+    charts = client.charts.get_many(range(1, 302), chunk_size=300)
+    assert list(charts) == list(range(1, 301))
+
+
+def test_lazy_json_fields(permanent_requests, requests_mock):
+    "Test that JSON fields are decoded on first access only"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dashboard/1",
+        json={"result": {"dashboard_title": "dashboard", "json_metadata": '{"color_scheme": "d3"}', "position_json": None}},
+    )
+
+    dashboard = client.dashboards.get(1)
+    assert "json_metadata" not in vars(dashboard)
+    # Undecoded fields are sent back as received
+    assert dashboard.to_json(["json_metadata"]) == {"json_metadata": '{"color_scheme": "d3"}'}
+
+    assert dashboard.colors == {}
+    assert dashboard.json_metadata["color_scheme"] == "d3"
+    assert dashboard.position_json == {}
+    dashboard.json_metadata["color_scheme"] = "bnbColors"
+    assert dashboard.to_json(["json_metadata"]) == {"json_metadata": '{"color_scheme": "bnbColors"}'}
+
+
+def test_lazy_json_fields_subclass():
+    "Test that subclasses of models created first decode JSON fields too"
+
+    @dataclasses.dataclass
+    class MyDashboard(Dashboard):
+        pass
+
+    dashboard = MyDashboard.from_json({"dashboard_title": "mine", "json_metadata": '{"label_colors": {"a": "#000000"}}'})
+    assert dashboard.colors == {"a": "#000000"}
+    assert Dashboard(dashboard_title="base", published=True).json_metadata == {}
+    dashboard = Dashboard(dashboard_title="base", published=True, json_metadata={"a": 1})
+    assert dashboard.to_json(["json_metadata"]) == {"json_metadata": '{"a": 1}'}
+
+
+def test_save_changed_fields(permanent_requests, requests_mock):
+    "Test that only modified fields are saved"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=None)
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dashboard/_info",
+        json={"edit_columns": [{"name": "dashboard_title"}, {"name": "json_metadata"}, {"name": "position_json"}]},
+    )
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dashboard/1",
+        json={"result": {"dashboard_title": "dashboard", "json_metadata": "{}", "position_json": '{"CHART-1": {}}'}},
+    )
+    put = requests_mock.put(f"{SUPERSET_API_URI}/dashboard/1", json={"id": 1})
+
+    dashboard = client.dashboards.get(1)
+    dashboard.position_json
+    dashboard.save()
+    assert dashboard.changed_fields() == []
+    assert not put.called
+
+    dashboard.update_colors({"label": "#000000"})
+    assert dashboard.changed_fields() == ["json_metadata"]
+    dashboard.save()
+    assert put.last_request.json() == {"json_metadata": '{"label_colors": {"label": "#000000"}}'}
+    assert dashboard.changed_fields() == []
+
+
+def test_save_fields_added_by_to_json(permanent_requests, requests_mock):
+    "Test that changes of fields sent by to_json but not editable are saved, whether infos were loaded or not"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=None)
+    requests_mock.get(f"{SUPERSET_API_URI}/chart/_info", json={"edit_columns": [{"name": "slice_name"}]})
+    requests_mock.get(f"{SUPERSET_API_URI}/chart/1", json={"result": {"slice_name": "chart", "dashboards": [1]}})
+    put = requests_mock.put(f"{SUPERSET_API_URI}/chart/1", json={"id": 1})
+
+    for _ in range(2):
+        # The second time, infos are loaded before the chart
+        chart = client.charts.get(1)
+        chart.dashboards.append(5)
+        assert chart.changed_fields() == ["dashboards"]
+        chart.save()
+        assert put.last_request.json() == {"dashboards": [1, 5]}
+        assert chart.changed_fields() == []
+    assert put.call_count == 2
+
+
+def test_save_many(permanent_requests, requests_mock):
+    "Test that failed saves don't abort a batch"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=None)
+    requests_mock.get(f"{SUPERSET_API_URI}/chart/_info", json={"edit_columns": [{"name": "slice_name"}]})
+    requests_mock.put(f"{SUPERSET_API_URI}/chart/1", json={"id": 1})
+    requests_mock.put(f"{SUPERSET_API_URI}/chart/2", status_code=422, json={"message": "Invalid"})
+    requests_mock.put(f"{SUPERSET_API_URI}/chart/3", json={"id": 3})
+    charts = [client.charts._object_from_json({"id": i, "slice_name": "chart"}) for i in (1, 2, 3)]
+    for chart in charts:
+        chart.slice_name = f"chart {chart.id}"
+
+    result = client.charts.save_many(charts, max_workers=2)
+    assert not result.ok
+    assert result.results == [charts[0], None, charts[2]]
+    assert list(result.errors) == [1]
+    assert result.errors[1].message == "Invalid"
+    assert charts[1].changed_fields() == ["slice_name"]
+
+
+def test_delete_many(permanent_requests, requests_mock):
+    "Test bulk deletion, and its fallback to one request per object"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    bulk = requests_mock.delete(f"{SUPERSET_API_URI}/chart/", json={"message": "Deleted 2 charts"})
+    requests_mock.delete(f"{SUPERSET_API_URI}/chart/?q=[3,4]", status_code=404, json={"message": "Not found"})
+    requests_mock.delete(f"{SUPERSET_API_URI}/chart/3", json={"message": "OK"})
+    requests_mock.delete(f"{SUPERSET_API_URI}/chart/4", status_code=404, json={"message": "Not found"})
+
+    result = client.charts.delete_many([1, 2, 3, 4], chunk_size=2)
+    assert bulk.last_request.qs == {"q": ["[1,2]"]}
+    assert result.results == [True, True, True, None]
+    assert list(result.errors) == [3]
+    assert result.errors[3].response.status_code == 404
+
+
+def test_delete_many_connection_error(permanent_requests, requests_mock):
+    "Test that a failed bulk request only fails its chunk"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.delete(f"{SUPERSET_API_URI}/chart/?q=[1,2]", exc=requests.exceptions.ConnectTimeout)
+    requests_mock.delete(f"{SUPERSET_API_URI}/chart/?q=[3,4]", json={"message": "Deleted 2 charts"})
+
+    result = client.charts.delete_many([1, 2, 3, 4], chunk_size=2, max_workers=2)
+    assert result.results == [None, None, True, True]
+    assert isinstance(result.errors[0], requests.exceptions.ConnectTimeout)
+    assert list(result.errors) == [0, 1]
+
+
+def test_add_many(permanent_requests, requests_mock):
+    "Test that created objects get their id, in the order of objects"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test", info_cache=None)
+    requests_mock.get(f"{SUPERSET_API_URI}/dataset/_info", json={"add_columns": [{"name": "table_name"}]})
+    requests_mock.post(
+        f"{SUPERSET_API_URI}/dataset/",
+        [{"json": {"id": 10}}, {"status_code": 422, "json": {"message": "Invalid"}}],
+    )
+    datasets = [Dataset(table_name="table"), Dataset(table_name="other")]
+
+    result = client.datasets.add_many(datasets, max_workers=1)
+    assert result.results == [datasets[0], None]
+    assert datasets[0].id == 10
+    assert datasets[0].changed_fields() == []
+    assert datasets[1].id is None
+    assert result.errors[1].message == "Invalid"
+
+
+def test_export_stream(permanent_requests, requests_mock):
+    "Test that exports are written by chunks to file objects"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    content = b"PK" + bytes(3 * 1024 * 1024)
+    requests_mock.get(
+        f"{SUPERSET_API_URI}/dashboard/export/",
+        content=content,
+        headers={"content-type": "application/zip", "content-length": str(len(content))},
+    )
+
+    progress = []
+    f = io.BytesIO()
+    client.dashboards.export([1, 2], f, progress=lambda written, total: progress.append((written, total)))
+    assert f.getvalue() == content
+    assert progress[-1] == (len(content), len(content))
+    assert len(progress) == 4
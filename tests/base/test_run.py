@@ -0,0 +1,185 @@
+import json
+import re
+import time
+
+import pytest
+
+from supersetapiclient.client import SupersetClient
+from supersetapiclient.exceptions import BadRequestError, QueryFailed, QueryLimitReached
+from tests.conftest import SUPERSET_API_URI, SUPERSET_BASE_URI
+
+COLUMNS = [{"name": "id", "type": "INT", "is_dttm": False}, {"name": "name", "type": "STRING", "is_dttm": False}]
+
+
+def sql_json(rows, limit_reached=False):
+    return json.dumps(
+        {"status": "success", "data": rows, "columns": COLUMNS, "displayLimit": 100, "displayLimitReached": limit_reached}
+    ).encode()
+
+
+def test_iter_run(permanent_requests, requests_mock):
+    "Test that query results are streamed"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    rows = [{"id": i, "name": f"row {i}"} for i in range(5)]
+    sql = requests_mock.post(f"{SUPERSET_BASE_URI}/superset/sql_json/", content=sql_json(rows))
+
+    assert list(client.iter_run(1, "SELECT * FROM t")) == rows
+    assert sql.last_request.json() == {"database_id": 1, "sql": "SELECT * FROM t"}
+    assert list(client.iter_run(1, "SELECT * FROM t", batch_size=2)) == [rows[:2], rows[2:4], rows[4:]]
+
+    requests_mock.post(f"{SUPERSET_BASE_URI}/superset/sql_json/", content=sql_json(rows, limit_reached=True))
+    batches = client.iter_run(1, "SELECT * FROM t", batch_size=2)
+    assert len(list(next(batches) for _ in range(3))) == 3
+    with pytest.raises(QueryLimitReached):
+        next(batches)
+
+
+def test_iter_run_error(permanent_requests, requests_mock):
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.post(f"{SUPERSET_BASE_URI}/superset/sql_json/", status_code=400, json={"message": "Syntax error"})
+    with pytest.raises(BadRequestError, match="Syntax error"):
+        list(client.iter_run(1, "SELEC"))
+
+
+def test_submit(permanent_requests, requests_mock):
+    "Test that asynchronous queries are polled until they finish"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    rows = [{"id": 1, "name": "row 1"}]
+    sql = requests_mock.post(
+        f"{SUPERSET_BASE_URI}/superset/sql_json/",
+        status_code=202,
+        json={"query": {"queryId": 5, "id": "abc", "state": "pending"}},
+    )
+    status = requests_mock.get(
+        f"{SUPERSET_API_URI}/query/5",
+        [
+            {"json": {"result": {"status": "running"}}},
+            {"json": {"result": {"status": "success", "results_key": "key"}}},
+        ],
+    )
+    requests_mock.get(f"{SUPERSET_API_URI}/sqllab/results/", content=sql_json(rows))
+
+    query = client.submit(1, "SELECT * FROM t")
+    assert sql.last_request.json()["runAsync"] is True
+    assert query.status == "pending"
+    assert query.wait(poll_interval=0.01) == "success"
+    assert status.call_count == 2
+    assert query.result() == (COLUMNS, rows)
+    assert list(query.iter_rows()) == rows
+    assert requests_mock.last_request.qs == {"q": ['{"key": "key"}']}
+
+
+def test_submit_cancel(permanent_requests, requests_mock):
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    requests_mock.post(
+        f"{SUPERSET_BASE_URI}/superset/sql_json/",
+        status_code=202,
+        json={"query": {"queryId": 5, "id": "abc", "state": "running"}},
+    )
+
+    def slow_status(request, context):
+        time.sleep(0.1)
+        return {"result": {"status": "running"}}
+
+    status = requests_mock.get(f"{SUPERSET_API_URI}/query/5", json=slow_status)
+    stop = requests_mock.post(f"{SUPERSET_API_URI}/query/stop", json={"result": "OK"})
+
+    query = client.submit(1, "SELECT * FROM t")
+    # The timeout includes the first poll
+    with pytest.raises(TimeoutError):
+        query.wait(timeout=0.05, poll_interval=0.01)
+    assert status.call_count == 1
+
+    requests_mock.get(f"{SUPERSET_API_URI}/query/5", json={"result": {"status": "stopped"}})
+    assert query.cancel() == "stopped"
+    assert stop.last_request.json() == {"client_id": query.client_id}
+    with pytest.raises(QueryFailed):
+        query.result()
+
+    # Finished queries are not stopped
+    requests_mock.post(f"{SUPERSET_BASE_URI}/superset/sql_json/", json={"data": [], "columns": COLUMNS})
+    query = client.submit(1, "SELECT * FROM t")
+    assert query.cancel() == "success"
+    assert stop.call_count == 1
+    assert query.result() == (COLUMNS, [])
+
+
+def test_run_output(permanent_requests, requests_mock):
+    "Test that results can be returned by column"
+
+    np = pytest.importorskip("numpy")
+    pd = pytest.importorskip("pandas")
+    pa = pytest.importorskip("pyarrow")
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    columns = [
+        {"name": "id", "type": "BIGINT", "type_generic": 0, "is_dttm": False},
+        {"name": "name", "type": "STRING", "type_generic": 1, "is_dttm": False},
+        {"name": "created", "type": "TIMESTAMP", "type_generic": 2, "is_dttm": True},
+        {"name": "score", "type": "DOUBLE", "type_generic": 0, "is_dttm": False},
+    ]
+    rows = [
+        {"id": 1, "name": "a", "created": "2023-01-01T10:00:00", "score": 1.5},
+        {"id": 2, "name": None, "created": "2023-01-02T10:00:00", "score": None},
+    ]
+    requests_mock.post(
+        f"{SUPERSET_BASE_URI}/superset/sql_json/",
+        content=json.dumps({"status": "success", "data": rows, "columns": columns}).encode(),
+    )
+
+    arrays = client.run(1, "SELECT * FROM t", output="numpy")
+    assert arrays["id"].dtype == np.int64
+    assert arrays["created"][1] == np.datetime64("2023-01-02T10:00:00")
+    assert np.isnan(arrays["score"][1])
+
+    df = client.run(1, "SELECT * FROM t", output="pandas")
+    assert list(df.columns) == ["id", "name", "created", "score"]
+    assert df["created"][0] == pd.Timestamp("2023-01-01 10:00:00")
+
+    table = client.run(1, "SELECT * FROM t", output="arrow")
+    assert table.column_names == ["id", "name", "created", "score"]
+    assert table.schema.field("created").type == pa.timestamp("ms")
+    assert table.column("score").null_count == 1
+
+    with pytest.raises(ValueError):
+        client.run(1, "SELECT * FROM t", output="csv")
+
+
+def test_iter_run_chunks(permanent_requests, requests_mock):
+    "Test that results are fetched by chunks until a chunk is not full"
+
+    client = SupersetClient(SUPERSET_BASE_URI, "test", "test")
+    rows = [{"id": i, "name": f"row {i}"} for i in range(25)]
+
+    def chunk(request, context):
+        match = re.search(r"WHERE id > (\d+)", request.json()["sql"])
+        start = int(match.group(1)) + 1 if match else 0
+        match = re.search(r"LIMIT (\d+)(?: OFFSET (\d+))?$", request.json()["sql"])
+        start += int(match.group(2) or 0)
+        return sql_json(rows[start : start + int(match.group(1))])
+
+    sql = requests_mock.post(f"{SUPERSET_BASE_URI}/superset/sql_json/", content=chunk)
+
+    assert list(client.iter_run(1, "SELECT * FROM t;", chunk_size=10, order_by="id", max_workers=2)) == rows
+    queries = [request.json()["sql"] for request in sql.request_history]
+    assert queries[:3] == [
+        "SELECT * FROM (\nSELECT * FROM t\n) AS _chunk ORDER BY id LIMIT 10",
+        "SELECT * FROM (\nSELECT * FROM t\n) AS _chunk ORDER BY id LIMIT 10 OFFSET 10",
+        "SELECT * FROM (\nSELECT * FROM t\n) AS _chunk ORDER BY id LIMIT 10 OFFSET 20",
+    ]
+
+    sql.reset()
+    assert list(client.iter_run(1, "SELECT * FROM t", chunk_size=10, order_by="id", keyset=True, batch_size=20)) == [
+        rows[:20],
+        rows[20:],
+    ]
+    assert sql.call_count == 3
+    assert sql.last_request.json()["sql"] == "SELECT * FROM (\nSELECT * FROM t\n) AS _chunk WHERE id > 19 ORDER BY id LIMIT 10"
+
+    assert list(client.iter_run(1, "SELECT * FROM t -- comment", query_limit=12, chunk_size=10, order_by="id")) == rows[:12]
+    assert sql.last_request.json()["sql"].startswith("SELECT * FROM (\nSELECT * FROM t -- comment\n) AS _chunk")
+    # Unordered chunks may overlap
+    with pytest.raises(ValueError):
+        list(client.iter_run(1, "SELECT * FROM t", chunk_size=10))
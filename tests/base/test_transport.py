@@ -0,0 +1,41 @@
+import socket
+import threading
+
+import pytest
+import requests
+
+from supersetapiclient.client import SupersetClient
+
+
+@pytest.fixture
+def silent_server():
+    "A server accepting connections, but never responding"
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    connections = []
+
+    def accept():
+        while True:
+            try:
+                connections.append(server.accept()[0])
+            except OSError:
+                return
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f"http://127.0.0.1:{server.getsockname()[1]}"
+    server.close()
+    for connection in connections:
+        connection.close()
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_read_timeout(silent_server, method):
+    "Test that read timeouts are raised as such without retries"
+
+    client = SupersetClient(silent_server, timeout=0.1)
+    session = requests.Session()
+    session.mount(silent_server, client.http_adapter())
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.request(method, silent_server)
@@ -8,6 +8,7 @@ import requests
 import requests.exceptions
 import requests_mock  # noqa
 
+from supersetapiclient.async_client import AsyncSupersetClient
 from supersetapiclient.client import SupersetClient
 
 # Testing configuration
@@ -23,6 +24,12 @@ class CustomClient(SupersetClient):
         return self.join_urls(self.base_url, "execute_sql_json/")
 
 
+class CustomAsyncClient(AsyncSupersetClient):
+    @property
+    def _sql_endpoint(self) -> str:
+        return self.join_urls(self.base_url, "execute_sql_json/")
+
+
 @pytest.fixture
 def permanent_requests(requests_mock):  # noqa
     # List domain in folder
@@ -73,6 +80,11 @@ def superset_api(superset_url):
     yield CustomClient(superset_url, "admin", "admin")
 
 
+@pytest.fixture
+def async_superset_api(superset_url):
+    yield CustomAsyncClient(superset_url, "admin", "admin")
+
+
 @pytest.fixture(scope="session")
 def docker_compose_file(pytestconfig):
     return str(Path(__file__).parent.parent / "docker-compose.yml")
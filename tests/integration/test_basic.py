@@ -1,3 +1,4 @@
+import asyncio
 import json
 import random
 import string
@@ -6,14 +7,17 @@ import tempfile
 import pytest
 import requests
 import requests.exceptions
+from urllib3.util import Retry
 
+from supersetapiclient.cache import ResponseCache
 from supersetapiclient.charts import Chart
-from supersetapiclient.client import SupersetClient, raise_for_status
+from supersetapiclient.client import NoVerifyHTTPAdapter, SupersetClient, raise_for_status
 from supersetapiclient.dashboards import Dashboard
 from supersetapiclient.databases import Database
 from supersetapiclient.datasets import Dataset
 from supersetapiclient.exceptions import BadRequestError, ComplexBadRequestError, MultipleFound, NotFound, QueryLimitReached
 from supersetapiclient.saved_queries import SavedQuery
+from tests.conftest import CustomClient
 
 
 def random_str(length, lowercase=False):
@@ -365,6 +369,21 @@ class TestEntities:
         assert superset_api.charts.get(id=chart.id).slice_name == chart.slice_name
         assert superset_api.charts.get(id=chart.id).viz_type == chart.viz_type
 
+        # Test column projection
+        partial = superset_api.charts.get(id=chart.id, columns=["slice_name"])
+        assert partial.id == chart.id
+        assert partial.slice_name == chart.slice_name
+        assert partial.viz_type == ""
+        partial.fetch()
+        assert partial.viz_type == chart.viz_type
+        partials = superset_api.charts.find(slice_name=chart.slice_name, columns=["slice_name"])
+        assert [(c.id, c.slice_name, c.viz_type) for c in partials] == [(chart.id, chart.slice_name, "")]
+
+        # Test batch get
+        charts = superset_api.charts.get_many([chart.id, chart.id, 0])
+        assert list(charts) == [chart.id]
+        assert charts[chart.id].slice_name == chart.slice_name
+
         # Test fetch
         chart.fetch()
 
@@ -458,6 +477,21 @@ class TestEntities:
         with pytest.raises(MultipleFound):
             superset_api.dashboards.find_one(dashboard_title=title)
 
+    def test_iter_find(self, superset_api):
+        title = random_str(8)
+        for _ in range(3):
+            superset_api.dashboards.add(Dashboard(dashboard_title=title, published=True, slug=random_str(8)))
+
+        dashboards = superset_api.dashboards.iter_find(page_size=2, dashboard_title=title)
+        assert not isinstance(dashboards, list)
+        assert [d.dashboard_title for d in dashboards] == [title] * 3
+        assert len(superset_api.dashboards.find_all(page_size=2, dashboard_title=title)) == 3
+
+        # Concurrent page prefetch yields the same objects in the same order
+        sequential = [d.id for d in superset_api.dashboards.iter_find(page_size=1, dashboard_title=title)]
+        concurrent = [d.id for d in superset_api.dashboards.iter_find(page_size=1, max_workers=4, dashboard_title=title)]
+        assert concurrent == sequential
+
 
 class TestClient:
     def test_no_verify(self, superset_url):
@@ -510,6 +544,44 @@ class TestClient:
         superset_api = SupersetClient("https://example.com")
         assert superset_api._sql_endpoint == "https://example.com/superset/sql_json/"
 
+    def test_transport(self):
+        superset_api = SupersetClient("https://example.com", retries=3, timeout=5, pool_maxsize=20)
+        adapter = superset_api.http_adapter()
+        assert adapter.timeout == 5
+        assert adapter._pool_maxsize == 20
+        assert adapter.max_retries.total == 3
+        assert 503 in adapter.max_retries.status_forcelist
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+        superset_api = SupersetClient("https://example.com", verify=False, retries=Retry(total=1))
+        adapter = superset_api.http_adapter()
+        assert isinstance(adapter, NoVerifyHTTPAdapter)
+        assert adapter.max_retries.total == 1
+
+        class PlainAdapter(requests.adapters.HTTPAdapter):
+            def __init__(self):
+                super().__init__()
+
+        superset_api = SupersetClient("https://example.com")
+        superset_api.http_adapter_cls = PlainAdapter
+        assert isinstance(superset_api.http_adapter(), PlainAdapter)
+
+    def test_response_cache(self, superset_url, dashboard):
+        cache = ResponseCache(ttl=60)
+        superset_api = CustomClient(superset_url, "admin", "admin", response_cache=cache)
+        for _ in range(3):
+            assert superset_api.dashboards.get(id=dashboard.id).dashboard_title == dashboard.dashboard_title
+        assert cache.misses == 1
+        assert cache.hits == 2
+
+        # Updates evict cached responses
+        d = superset_api.dashboards.get(id=dashboard.id)
+        d.dashboard_title = random_str(8)
+        d.save()
+        misses = cache.misses
+        assert superset_api.dashboards.get(id=dashboard.id).dashboard_title == d.dashboard_title
+        assert cache.misses == misses + 1
+
     def test_export_failure(self, requests_mock, superset_api):
         requests_mock.real_http = True
         requests_mock.get(
@@ -522,6 +594,37 @@ class TestClient:
         assert exc_info.value.args[0] == "Unknown content type application/x"
 
 
+class TestAsyncClient:
+    def test_entities(self, async_superset_api, superset_api, database, chart, dashboard):
+        async def main():
+            async with async_superset_api as client:
+                assert (await client.charts.get(id=chart.id)).slice_name == chart.slice_name
+                assert await client.charts.count() >= 1
+                assert chart.id in {c.id for c in await client.charts.find_all(page_size=1, max_workers=4)}
+
+                # Objects returned by an async factory have awaitable methods
+                c = await client.charts.find_one(slice_name=chart.slice_name)
+                c.slice_name = random_str(8)
+                await c.save()
+                assert superset_api.charts.get(id=chart.id).slice_name == c.slice_name
+                await c.fetch()
+
+                # Concurrent requests
+                dashboards = await asyncio.gather(*(client.dashboards.get(id=dashboard.id) for _ in range(5)))
+                assert {d.dashboard_title for d in dashboards} == {dashboard.dashboard_title}
+
+                # Concurrent token refreshes are collapsed into a single one
+                access_token = client._token["access_token"]
+                await asyncio.gather(*(client.refresh_access_token(access_token) for _ in range(3)))
+                assert client._token["access_token"] != access_token
+                assert await client.charts.count() >= 1
+
+                columns, data = await client.run(database_id=database.id, query="SELECT 1 AS i")
+                assert data == [{"i": 1}]
+
+        asyncio.run(main())
+
+
 class TestExceptions:
     def test_raise_for_status(self, requests_mock):
         url = "https://example.com"
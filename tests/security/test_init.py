@@ -1,3 +1,13 @@
+import base64
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from supersetapiclient.cache import FileCache
+from supersetapiclient.client import SupersetClient, jwt_expiry
+from tests.conftest import SUPERSET_API_URI, SUPERSET_BASE_URI
+
+
 def test_client(client):
     "Test basic superset client"
 
@@ -6,3 +16,115 @@ def test_client(client):
         "access_token": "example_access_token",
         "refresh_token": "example_refresh_token",
     }
+
+
+def test_concurrent_token_refresh(client, requests_mock):
+    "Test that threads hitting an expired token share a single refresh"
+
+    url = client.join_urls(client.base_url, "chart/")
+
+    def chart_list(request, context):
+        if request.headers["Authorization"] == "Bearer example_access_token":
+            context.status_code = 401
+            return {"msg": "Token has expired"}
+        return {"count": 0, "result": []}
+
+    requests_mock.get(url, json=chart_list)
+    refresh = requests_mock.post(
+        client.refresh_endpoint,
+        json={"access_token": "new_access_token"},
+    )
+
+    client.session  # Login before starting threads
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        counts = list(executor.map(lambda _: client.charts.count(), range(16)))
+
+    assert counts == [0] * 16
+    assert refresh.call_count == 1
+    assert client.session.token == {
+        "access_token": "new_access_token",
+        "refresh_token": "example_refresh_token",
+    }
+
+
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def test_jwt_expiry():
+    "Test reading the expiry of access tokens"
+
+    assert jwt_expiry(make_jwt(1234)) == 1234
+    assert jwt_expiry("example_access_token") is None
+
+
+def test_proactive_token_refresh(client, requests_mock):
+    "Test that access tokens are refreshed before they expire"
+
+    expiring_token, fresh_token = make_jwt(time.time() + 10), make_jwt(time.time() + 900)
+    requests_mock.post(
+        client.login_endpoint,
+        json={"access_token": expiring_token, "refresh_token": "example_refresh_token"},
+    )
+    refresh = requests_mock.post(client.refresh_endpoint, json={"access_token": fresh_token})
+    charts = requests_mock.get(client.charts.base_url, json={"count": 0, "result": []})
+
+    assert client.charts.count() == 0
+    assert client.charts.count() == 0
+    assert refresh.call_count == 1
+    assert [r.headers["Authorization"] for r in charts.request_history] == [f"Bearer {fresh_token}"] * 2
+
+
+def test_credentials_cache(permanent_requests, requests_mock, tmp_path):
+    "Test that clients reuse cached credentials instead of logging in"
+
+    cache = FileCache(tmp_path)
+    login = requests_mock.post(
+        f"{SUPERSET_API_URI}/security/login",
+        json={"access_token": "example_access_token", "refresh_token": "example_refresh_token"},
+    )
+    csrf = requests_mock.get(f"{SUPERSET_API_URI}/security/csrf_token/", json={"result": "test_csrf_token"})
+    charts = requests_mock.get(f"{SUPERSET_API_URI}/chart/", json={"count": 0, "result": []})
+    add_chart = requests_mock.post(f"{SUPERSET_API_URI}/chart/", json={"id": 1})
+
+    for _ in range(3):
+        client = SupersetClient(SUPERSET_BASE_URI, "test", "test", credentials_cache=cache)
+        assert client.charts.count() == 0
+        client.post(client.charts.base_url, json={})
+
+    assert login.call_count == 1
+    assert csrf.call_count == 1
+    assert charts.call_count == 3
+    assert add_chart.last_request.headers["X-CSRFToken"] == "test_csrf_token"
+
+    # Credentials are cached per user
+    client = SupersetClient(SUPERSET_BASE_URI, "other", "other", credentials_cache=cache)
+    client.charts.count()
+    assert login.call_count == 2
+
+    # Expired refresh tokens are not reused
+    cache.set(
+        client._credentials_key,
+        {**cache.get(client._credentials_key), "token": {"access_token": "", "refresh_token": make_jwt(0)}},
+    )
+    client = SupersetClient(SUPERSET_BASE_URI, "other", "other", credentials_cache=cache)
+    client.charts.count()
+    assert login.call_count == 3
+
+
+def test_lazy_csrf_token(client, requests_mock):
+    "Test that the CSRF token is only fetched for requests that need it"
+
+    csrf = requests_mock.get(f"{SUPERSET_API_URI}/security/csrf_token/", json={"result": "test_csrf_token"})
+    charts = requests_mock.get(client.charts.base_url, json={"count": 0, "result": []})
+    delete_chart = requests_mock.delete(client.join_urls(client.charts.base_url, 1), json={"message": "OK"})
+
+    assert client.charts.count() == 0
+    assert csrf.call_count == 0
+    assert "X-CSRFToken" not in charts.last_request.headers
+
+    assert client.charts.delete(1)
+    assert client.charts.delete(1)
+    assert csrf.call_count == 1
+    assert delete_chart.last_request.headers["X-CSRFToken"] == "test_csrf_token"